@@ -0,0 +1,321 @@
+"""
+سنجش کارایی لایه داده با داده‌های مصنوعی.
+
+اجرا بدون مرورگر:
+    python benchmark.py --sizes 1000 10000 100000 --output benchmark.json
+    python benchmark.py --sizes 1000000 --no-memory
+    python benchmark.py --compare benchmark_old.json
+
+هر اندازه در یک دایرکتوری موقت جداگانه اجرا می‌شود تا فایل‌های واقعی برنامه دست نخورند.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import check_utils
+import db_utils
+import deb_utils
+import engine
+import lines_utils
+import store_utils
+from date_utils import _get_table
+from export_utils import export_file
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+BANK_COUNT = 20
+PARTNER_COUNT = 50
+
+
+# ---------------------
+# 🧪 تولید داده‌های مصنوعی
+# ---------------------
+def _jalali_dates(rng, n):
+    """تاریخ‌های شمسی تصادفی در بازه جدول تبدیل"""
+    jalali = _get_table()["jalali"]
+    start = len(jalali) - 5 * 365
+    return jalali[rng.integers(start, len(jalali) - 365, n)]
+
+
+def _gregorian_dates(rng, n):
+    """تاریخ‌های میلادی تصادفی (متن YYYY/MM/DD) مثل فایل‌های چک و بدهی"""
+    gregorian = _get_table()["gregorian"]
+    start = len(gregorian) - 5 * 365
+    return gregorian[rng.integers(start, len(gregorian) - 365, n)]
+
+
+def make_banks(rng, n=BANK_COUNT):
+    """بانک‌ها با موجودی اولیه بزرگ تا برداشت‌ها منفی نشوند"""
+    return pd.DataFrame({
+        "Bank Name": [f"بانک {i}" for i in range(n)],
+        "Balance": rng.integers(10**9, 10**10, n).astype(float),
+    })
+
+
+def make_transactions(rng, n, bank_names):
+    """تراکنش‌ها با ایندکس به عنوان شناسه، مثل خروجی load_transactions"""
+    df = pd.DataFrame({
+        "Bank Name": np.asarray(bank_names, dtype=object)[rng.integers(0, len(bank_names), n)],
+        "Transaction Type": np.where(rng.random(n) < 0.6, "واریز", "برداشت").astype(object),
+        "Amount": (rng.integers(1, 5000, n) * 1000).astype(float),
+        "Date": np.sort(_jalali_dates(rng, n)),
+        "Purpose": np.array(["خرید", "فروش", "حقوق", "اجاره", "قسط"], dtype=object)[rng.integers(0, 5, n)],
+        "Person": [f"شخص {i}" for i in rng.integers(0, 500, n)],
+        "Receipt": "",
+    })
+    df.index = np.arange(1, n + 1)
+    return df
+
+
+def make_checks(rng, n):
+    """چک‌ها با تاریخ وصول میلادی، مثل ذخیره register_check"""
+    return pd.DataFrame({
+        "ID": [str(uuid.UUID(int=int(x))) for x in rng.integers(0, 2**63, n)],
+        "Check Type": np.where(rng.random(n) < 0.5, "دریافتی", "صادر شده").astype(object),
+        "Check Number": [str(x) for x in rng.integers(10**6, 10**7, n)],
+        "Due Date": _gregorian_dates(rng, n),
+        "Owner Name": [f"دارنده {i}" for i in rng.integers(0, 500, n)],
+        "Amount": (rng.integers(1, 5000, n) * 10000).astype(float),
+        "Description": "بابت فاکتور",
+        "Account Owner": [f"صاحب حساب {i}" for i in rng.integers(0, 100, n)],
+        "Image Path": "",
+    })
+
+
+def make_debts(rng, n):
+    """طلبکاران و بدهکاران با تاریخ‌های میلادی"""
+    return pd.DataFrame({
+        "ID": [str(uuid.UUID(int=int(x))) for x in rng.integers(0, 2**63, n)],
+        "Type": np.where(rng.random(n) < 0.5, "طلبکار", "بدهکار").astype(object),
+        "Name": [f"نام {i}" for i in rng.integers(0, 1000, n)],
+        "Amount": (rng.integers(1, 5000, n) * 10000).astype(float),
+        "Description": "توضیحات",
+        "Due Date": _gregorian_dates(rng, n),
+        "Contact": [f"0912{x:07d}" for x in rng.integers(0, 10**7, n)],
+        "Registered Date": _gregorian_dates(rng, n),
+    })
+
+
+def make_partners(rng, n=PARTNER_COUNT):
+    """شرکا با شناسه UUID"""
+    return pd.DataFrame({
+        "ID": [str(uuid.UUID(int=int(x))) for x in rng.integers(0, 2**63, n)],
+        "Name": [f"شریک {i}" for i in range(n)],
+        "Phone": [f"0912{x:07d}" for x in rng.integers(0, 10**7, n)],
+        "Address": "تهران",
+        "Register Date": _jalali_dates(rng, n),
+    })
+
+
+def make_phone_numbers(rng, n, partner_ids):
+    """شماره‌های تلفن؛ حدود یک سوم بدون شریک و یک پنجم فروخته شده"""
+    partners = np.asarray(list(partner_ids) + [None], dtype=object)
+    return pd.DataFrame({
+        "ID": [str(uuid.UUID(int=int(x))) for x in rng.integers(0, 2**63, n)],
+        "Phone Number": [f"0912{x:07d}" for x in rng.integers(0, 10**7, n)],
+        "Price": (rng.integers(1, 500, n) * 100000).astype(float),
+        "Description": "",
+        "Register Date": _jalali_dates(rng, n),
+        "Status": np.where(rng.random(n) < 0.8, "موجود", "فروخته شده").astype(object),
+        "Partner ID": partners[rng.integers(0, len(partners), n)],
+    })
+
+
+# ---------------------
+# ⏱️ اندازه‌گیری
+# ---------------------
+def _reset_caches():
+    """پاک کردن کش‌های بین اجرا تا خواندن واقعاً از دیسک انجام شود"""
+    store_utils.flush()
+    store_utils._cache.clear()
+    store_utils._query_cache.clear()
+    store_utils._sums.clear()
+    store_utils._sorted.clear()
+
+
+def _measure(setup, func, memory):
+    """
+    زمان اجرا و در صورت درخواست، بیشینه حافظه در یک اجرای جداگانه.
+    setup قبل از هر اجرا و خارج از اندازه‌گیری اجرا می‌شود.
+    """
+    if setup is not None:
+        setup()
+    gc.collect()
+    start = time.perf_counter()
+    func()
+    seconds = time.perf_counter() - start
+
+    peak_mb = None
+    if memory:
+        if setup is not None:
+            setup()
+        gc.collect()
+        tracemalloc.start()
+        try:
+            func()
+            peak_mb = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+        finally:
+            tracemalloc.stop()
+    return seconds, peak_mb
+
+
+def _operations(rng, size):
+    """
+    لیست عملیات‌ها برای یک اندازه: (نام، تابع آماده‌سازی، تابع اندازه‌گیری‌شده)
+    آماده‌سازی قبل از هر اجرا انجام می‌شود و در زمان حساب نمی‌شود.
+    """
+    df_banks = make_banks(rng)
+    df_transactions = make_transactions(rng, size, df_banks["Bank Name"])
+    df_checks = make_checks(rng, size)
+    df_debts = make_debts(rng, size)
+    df_partners = make_partners(rng)
+    df_phones = make_phone_numbers(rng, size, df_partners["ID"])
+    some_bank = df_banks["Bank Name"].iloc[0]
+    # هر اجرای delete_debt یک شناسه تازه (از انتهای جدول) حذف می‌کند
+    debt_ids = iter(df_debts["ID"].iloc[::-1])
+
+    def save_all():
+        engine.save_data(df_banks, df_transactions)
+        store_utils.flush()
+
+    def seed_tables():
+        save_all()
+        check_utils.save_checks_data(df_checks)
+        deb_utils.save_debts_data(df_debts)
+        lines_utils.save_partners(df_partners)
+        lines_utils.save_phone_numbers(df_phones)
+        _reset_caches()
+
+    def update_balance():
+        engine.update_bank_balance(db_utils.load_banks(), some_bank, 1000.0, "add")
+
+    def delete_last_transaction():
+        df = db_utils.load_transactions()
+        engine.delete_transaction(engine.load_balances(), df, df.index[-1])
+
+    def debts_prep():
+        df = deb_utils.load_debts_data()
+        deb_utils.debts_display_frame(df)
+        deb_utils.debt_totals()
+
+    def phones_prep():
+        df = lines_utils.load_phone_numbers()
+        df = df[df["Status"] == "موجود"]
+        lines_utils.phones_display_frame(df, lines_utils.load_partner_names())
+
+    return [
+        ("save_data", _reset_caches, save_all),
+        ("load_data (cold)", seed_tables, engine.load_data),
+        ("load_data (warm)", engine.load_data, engine.load_data),
+        ("update_bank_balance", None, update_balance),
+        ("delete_transaction", None, delete_last_transaction),
+        ("export transactions (csv)", None, lambda: export_file(
+            dict(zip(db_utils.TRANSACTION_COLUMNS, db_utils.TRANSACTION_COLUMNS)), db_utils.iter_transactions(), "CSV"
+        ).close()),
+        ("export transactions (xlsx)", None, lambda: export_file(
+            dict(zip(db_utils.TRANSACTION_COLUMNS, db_utils.TRANSACTION_COLUMNS)), db_utils.iter_transactions(), "Excel"
+        ).close()),
+        ("save_checks_data", None, lambda: (check_utils.save_checks_data(df_checks), store_utils.flush())),
+        ("load_checks_data (cold)", _reset_caches, check_utils.load_checks_data),
+        ("load_checks_data (warm)", None, check_utils.load_checks_data),
+        ("display_debts data prep (cold)", _reset_caches, debts_prep),
+        ("display_debts data prep (warm)", None, debts_prep),
+        ("delete_debt", None, lambda: deb_utils.delete_debt(next(debt_ids))),
+        ("phone listing data prep (cold)", _reset_caches, phones_prep),
+        ("phone listing data prep (warm)", None, phones_prep),
+    ]
+
+
+def run_size(size, memory, seed):
+    """اجرای همه عملیات‌ها برای یک اندازه در دایرکتوری موقت"""
+    results = []
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="benchmark_") as directory:
+        os.chdir(directory)
+        try:
+            db_utils._initialized = False
+            _reset_caches()
+            rng = np.random.default_rng(seed)
+            for name, setup, func in _operations(rng, size):
+                seconds, peak_mb = _measure(setup, func, memory)
+                results.append({
+                    "size": size,
+                    "operation": name,
+                    "seconds": round(seconds, 6),
+                    "peak_mb": None if peak_mb is None else round(peak_mb, 3),
+                })
+                print(f"{size:>9} {name:<34} {seconds:>10.4f}s" + (f" {peak_mb:>10.1f} MB" if peak_mb is not None else ""))
+        finally:
+            store_utils.flush()
+            os.chdir(cwd)
+    return results
+
+
+# ---------------------
+# 📄 گزارش
+# ---------------------
+def _git_commit():
+    """شناسه کامیت جاری؛ None اگر در مخزن git نباشیم"""
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)), stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except Exception:
+        return None
+
+
+def compare(report, baseline):
+    """چاپ نسبت زمان هر عملیات به گزارش پایه"""
+    old = {(r["size"], r["operation"]): r["seconds"] for r in baseline["results"]}
+    print(f"\nمقایسه با {baseline.get('commit')}:")
+    for r in report["results"]:
+        before = old.get((r["size"], r["operation"]))
+        if before:
+            print(f"{r['size']:>9} {r['operation']:<34} {before:>10.4f}s -> {r['seconds']:>10.4f}s  x{r['seconds'] / before:.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="سنجش کارایی لایه داده")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="تعداد ردیف‌ها (مثلاً 1000 10000 100000 1000000)")
+    parser.add_argument("--output", default="benchmark.json", help="مسیر گزارش JSON")
+    parser.add_argument("--no-memory", action="store_true", help="بدون اندازه‌گیری حافظه (سریع‌تر)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--compare", help="گزارش JSON قبلی برای مقایسه")
+    args = parser.parse_args(argv)
+
+    results = []
+    for size in args.sizes:
+        results.extend(run_size(size, not args.no_memory, args.seed))
+
+    report = {
+        "commit": _git_commit(),
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\nگزارش در {args.output} ذخیره شد.")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(report, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
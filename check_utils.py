@@ -2,87 +2,64 @@
 # 📌 توابع مربوط به چک‌ها
 # ---------------------
 import streamlit as st
-import pandas as pd
-from datetime import datetime
-import os
-import jdatetime
-from PIL import Image
-import io
+import uuid
+from store_utils import (
+    load_table, load_sums, save_table, append_record,
+    delete_records, assign_ids, load_id_index, rows_due_between
+)
+from date_utils import convert_to_jalali, convert_to_gregorian, convert_series_to_jalali
+from format_utils import format_currency, format_currency_series
+from image_utils import save_image, thumbnail_series
+from profiling_utils import profiled
+from export_utils import due_date_chunks, export_widget
+# search_utils (و همراه آن db_utils و sqlite3) فقط هنگام نوشتن وارد می‌شود تا صفحه چک‌ها سبک بارگذاری شود
 checks_file = "checks.xlsx"
 checks_dir = "checks_images"
-def format_currency(amount):
-    """فرمت کردن مبلغ با کاما برای نمایش"""
-    try:
-        return "{:,.0f}".format(float(amount))
-    except:
-        return amount
-
-def parse_currency(amount_str):
-    """تبدیل مبلغ فرمت شده به عدد برای ذخیره"""
-    try:
-        return float(str(amount_str).replace(",", "").strip())
-    except:
-        return 0.0
+checks_columns = [
+    "ID", "Check Type", "Check Number", "Due Date", "Owner Name", 
+    "Amount", "Description", "Account Owner", "Image Path"
+]
 
-def convert_to_jalali(gregorian_date):
-    """تبدیل تاریخ میلادی به شمسی"""
-    try:
-        if isinstance(gregorian_date, str):
-            gregorian_date = datetime.strptime(gregorian_date, "%Y/%m/%d")
-        jalali_date = jdatetime.date.fromgregorian(date=gregorian_date)
-        return jalali_date.strftime("%Y/%m/%d")
-    except:
-        return gregorian_date
+@profiled(checks_file)
+def load_checks_data():
+    """بارگذاری داده‌های چک‌ها؛ چک‌های قدیمی بدون شناسه یک بار شناسه دائمی می‌گیرند"""
+    df_checks, added = assign_ids(load_table(checks_file, checks_columns))
+    if added:
+        save_checks_data(df_checks)
+    return df_checks
 
-def convert_to_gregorian(jalali_date_str):
-    """تبدیل تاریخ شمسی به میلادی"""
-    try:
-        year, month, day = map(int, jalali_date_str.split('/'))
-        gregorian_date = jdatetime.date(year, month, day).togregorian()
-        return gregorian_date.strftime("%Y/%m/%d")
-    except:
-        return jalali_date_str
+@profiled(checks_file)
+def check_totals():
+    """جمع مبلغ چک‌ها به تفکیک نوع؛ با هر ثبت یا حذف فقط همان رکورد اعمال می‌شود"""
+    return load_sums(checks_file, checks_columns, "Check Type")
 
-def save_image(uploaded_file, directory, filename):
-    """ذخیره تصویر آپلود شده"""
-    try:
-        file_path = os.path.join(directory, filename)
-        with open(file_path, "wb") as f:
-            f.write(uploaded_file.getbuffer())
-        return file_path
-    except Exception as e:
-        st.error(f"خطا در ذخیره تصویر: {str(e)}")
-        return None
+@profiled(checks_file)
+def checks_due_between(start_date=None, end_date=None):
+    """چک‌هایی که تاریخ وصولشان در بازه میلادی است، به ترتیب تاریخ"""
+    return rows_due_between(checks_file, checks_columns, load_checks_data, start_date, end_date)
 
+# ستون‌های فایل خروجی چک‌ها
+CHECK_EXPORT_COLUMNS = {
+    "Check Type": "نوع چک", "Check Number": "شماره چک", "Due Date": "تاریخ وصول",
+    "Owner Name": "نام دارنده", "Amount": "مبلغ", "Description": "بابت", "Account Owner": "صاحب حساب",
+}
 
-def load_checks_data():
-    """بارگذاری داده‌های چک‌ها"""
-    if os.path.exists(checks_file):
-        df_checks = pd.read_excel(checks_file)
-    else:
-        df_checks = pd.DataFrame(columns=[
-            "Check Type", "Check Number", "Due Date", "Owner Name", 
-            "Amount", "Description", "Account Owner", "Image Path"
-        ])
-    return df_checks
-
+@profiled(checks_file)
 def save_checks_data(df_checks):
     """ذخیره داده‌های چک‌ها"""
-    df_checks.to_excel(checks_file, index=False)
+    save_table(checks_file, df_checks)
+    from search_utils import index_table
+    index_table("checks", df_checks)
 
+@profiled(checks_file)
 def register_check(check_type, check_number, due_date, owner_name, 
                   amount, description, account_owner, check_image):
     """ثبت چک جدید"""
     try:
-        df_checks = load_checks_data()
-        
         # ذخیره تصویر چک
         image_path = ""
         if check_image is not None:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            ext = os.path.splitext(check_image.name)[1]
-            image_filename = f"check_{check_number}_{timestamp}{ext}"
-            image_path = save_image(check_image, checks_dir, image_filename)
+            image_path = save_image(check_image, checks_dir) or ""
         
         # تبدیل تاریخ به شمسی برای نمایش
         jalali_due_date = convert_to_jalali(due_date)
@@ -90,22 +67,36 @@ def register_check(check_type, check_number, due_date, owner_name,
         # تبدیل تاریخ به میلادی برای ذخیره سازی
         gregorian_due_date = convert_to_gregorian(jalali_due_date)
         
-        # ثبت چک جدید
-        new_check = pd.DataFrame([[
-            check_type, check_number, gregorian_due_date, owner_name,
-            amount, description, account_owner, image_path
-        ]], columns=[
-            "Check Type", "Check Number", "Due Date", "Owner Name", 
-            "Amount", "Description", "Account Owner", "Image Path"
-        ])
-        
-        df_checks = pd.concat([df_checks, new_check], ignore_index=True)
-        save_checks_data(df_checks)
+        # ثبت چک جدید در ژورنال و ایندکس متنی
+        row = {
+            "ID": str(uuid.uuid4()), "Check Type": check_type, "Check Number": check_number,
+            "Due Date": gregorian_due_date, "Owner Name": owner_name,
+            "Amount": amount, "Description": description,
+            "Account Owner": account_owner, "Image Path": image_path
+        }
+        append_record(checks_file, row)
+        from search_utils import index_record
+        index_record("checks", row)
         
         return True, jalali_due_date
     except Exception as e:
         return False, str(e)
 
+@profiled(checks_file)
+def delete_checks(check_ids):
+    """
+    حذف چک‌ها با شناسه؛ فقط یک tombstone به ژورنال اضافه می‌شود
+    :return: تعداد چک‌های حذف‌شده
+    """
+    ids = load_id_index(checks_file, checks_columns)
+    check_ids = [str(i) for i in check_ids if str(i) in ids]
+    if check_ids:
+        delete_records(checks_file, check_ids)
+        from search_utils import unindex_records
+        unindex_records("checks", check_ids)
+    return len(check_ids)
+
+@profiled(checks_file)
 def display_checks():
     """نمایش لیست چک‌ها"""
     df_checks = load_checks_data()
@@ -115,8 +106,11 @@ def display_checks():
         return
     
     # تبدیل تاریخ‌ها به شمسی برای نمایش
-    display_df = df_checks.copy()
-    display_df["Due Date"] = display_df["Due Date"].apply(convert_to_jalali)
+    display_df = df_checks.drop(columns="ID")
+    display_df["Due Date"] = convert_series_to_jalali(display_df["Due Date"])
+    
+    # لینک به تصویر کوچک به جای تصویر اصلی
+    display_df["Image Path"] = thumbnail_series(display_df["Image Path"])
     
     # تغییر نام ستون‌ها به فارسی
     display_df.columns = [
@@ -125,7 +119,7 @@ def display_checks():
     ]
     
     # فرمت کردن مبلغ
-    display_df["مبلغ"] = display_df["مبلغ"].apply(format_currency)
+    display_df["مبلغ"] = format_currency_series(display_df["مبلغ"])
     
     # نمایش جدول
     st.dataframe(
@@ -144,12 +138,30 @@ def display_checks():
         use_container_width=True
     )
     
-    # محاسبه جمع مبالغ
-    total_received = df_checks[df_checks["Check Type"] == "دریافتی"]["Amount"].sum()
-    total_issued = df_checks[df_checks["Check Type"] == "صادر شده"]["Amount"].sum()
+    # جمع مبالغ از جمع‌های نگهداری‌شده خوانده می‌شود
+    totals = check_totals()
+    total_received = totals.get("دریافتی", 0)
+    total_issued = totals.get("صادر شده", 0)
     
     st.markdown(f"""
     **جمع کل چک‌های دریافتی:** {format_currency(total_received)} ریال  
     **جمع کل چک‌های صادر شده:** {format_currency(total_issued)} ریال  
     **مانده چک‌ها:** {format_currency(total_received - total_issued)} ریال
-    """)
\ No newline at end of file
+    """)
+    
+    # حذف چک‌ها با شناسه (نه شماره ردیف که با تغییر فایل جابه‌جا می‌شود)
+    labels = dict(zip(
+        df_checks["ID"],
+        df_checks["Check Number"].astype(str) + " - " + df_checks["Owner Name"].astype(str) + " - " + display_df["تاریخ وصول"].astype(str)
+    ))
+    selected = st.multiselect("چک‌ها را برای حذف انتخاب کنید", list(labels), format_func=labels.get, key="delete_checks")
+    if selected and st.button(f"حذف {len(selected)} چک", key="delete_selected_checks"):
+        if delete_checks(selected):
+            st.rerun()
+    
+    # خروجی کل چک‌ها (یا یک بازه تاریخ وصول) بدون ساخت جدول کامل در حافظه
+    export_widget(
+        "checks", CHECK_EXPORT_COLUMNS,
+        lambda start_date, end_date: due_date_chunks(checks_file, checks_columns, load_checks_data, start_date, end_date),
+        "checks",
+    )
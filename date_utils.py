@@ -0,0 +1,192 @@
+from datetime import datetime
+from functools import lru_cache
+
+import jdatetime
+import numpy as np
+import pandas as pd
+
+from profiling_utils import profiled
+
+# ---------------------
+# 📅 تبدیل تاریخ شمسی/میلادی
+# ---------------------
+# برای بازه کاری (سال‌های ۱۳۷۰ تا ۱۴۴۰ شمسی) یک جدول از پیش ساخته می‌شود
+# و تبدیل هر تاریخ فقط یک جستجو در آرایه یا دیکشنری است.
+# تاریخ‌های خارج از این بازه با jdatetime و کش LRU تبدیل می‌شوند.
+TABLE_FIRST_YEAR = 1370
+TABLE_LAST_YEAR = 1440
+
+_table = None
+
+
+def _build_table():
+    """ساخت جدول تاریخ‌های شمسی و میلادی متناظر، روز به روز"""
+    jalali = []
+    for year in range(TABLE_FIRST_YEAR, TABLE_LAST_YEAR + 1):
+        leap = jdatetime.date(year, 1, 1).isleap()
+        for month in range(1, 13):
+            days = 31 if month <= 6 else 30 if month <= 11 else 30 if leap else 29
+            jalali.extend(f"{year:04d}/{month:02d}/{day:02d}" for day in range(1, days + 1))
+
+    start = np.datetime64(jdatetime.date(TABLE_FIRST_YEAR, 1, 1).togregorian(), "D")
+    gregorian = np.datetime_as_string(start + np.arange(len(jalali)), unit="D")
+    gregorian = np.char.replace(gregorian, "-", "/").astype(object)
+    jalali = np.array(jalali, dtype=object)
+
+    return {
+        "start": start,
+        "jalali": jalali,
+        "gregorian": gregorian,
+        "jalali_index": pd.Index(jalali),
+        "gregorian_index": pd.Index(gregorian),
+        "to_jalali": dict(zip(gregorian, jalali)),
+        "to_gregorian": dict(zip(jalali, gregorian)),
+    }
+
+
+def _get_table():
+    """جدول تبدیل؛ فقط در اولین استفاده ساخته می‌شود"""
+    global _table
+    if _table is None:
+        _table = _build_table()
+    return _table
+
+
+@lru_cache(maxsize=4096)
+def _convert_to_jalali(gregorian_date):
+    """تبدیل تاریخ میلادی به شمسی با jdatetime (برای تاریخ‌های خارج از جدول)"""
+    try:
+        if isinstance(gregorian_date, str):
+            gregorian_date = datetime.strptime(gregorian_date, "%Y/%m/%d")
+        jalali_date = jdatetime.date.fromgregorian(date=gregorian_date)
+        return jalali_date.strftime("%Y/%m/%d")
+    except:
+        return gregorian_date
+
+
+@lru_cache(maxsize=4096)
+def _convert_to_gregorian(jalali_date_str):
+    """تبدیل تاریخ شمسی به میلادی با jdatetime (برای تاریخ‌های خارج از جدول)"""
+    try:
+        year, month, day = map(int, jalali_date_str.split('/'))
+        gregorian_date = jdatetime.date(year, month, day).togregorian()
+        return gregorian_date.strftime("%Y/%m/%d")
+    except:
+        return jalali_date_str
+
+
+def convert_to_jalali(gregorian_date):
+    """تبدیل تاریخ میلادی به شمسی"""
+    if isinstance(gregorian_date, str):
+        jalali_date = _get_table()["to_jalali"].get(gregorian_date)
+        if jalali_date is not None:
+            return jalali_date
+    return _convert_to_jalali(gregorian_date)
+
+
+def convert_to_gregorian(jalali_date_str):
+    """تبدیل تاریخ شمسی به میلادی"""
+    if isinstance(jalali_date_str, str):
+        gregorian_date = _get_table()["to_gregorian"].get(jalali_date_str)
+        if gregorian_date is not None:
+            return gregorian_date
+    return _convert_to_gregorian(jalali_date_str)
+
+
+def _lookup(series, positions, values, fallback):
+    """
+    ساخت ستون خروجی از موقعیت‌های پیدا شده در جدول.
+    موقعیت -1 یعنی مقدار در جدول نبود و با تابع تکی (کش LRU) تبدیل می‌شود.
+    """
+    series = pd.Series(series)
+    found = positions >= 0
+    result = np.empty(len(series), dtype=object)
+    result[found] = values[positions[found]]
+
+    if not found.all():
+        result[~found] = [
+            value if pd.isna(value) else fallback(value)
+            for value in series[~found].astype(object)
+        ]
+    return pd.Series(result, index=series.index, dtype=object)
+
+
+@profiled()
+def convert_series_to_jalali(series):
+    """
+    تبدیل برداری یک ستون تاریخ میلادی (متن YYYY/MM/DD یا datetime) به شمسی.
+    مقادیر نامعتبر مثل تابع convert_to_jalali بدون تغییر برگردانده می‌شوند.
+    """
+    table = _get_table()
+    series = pd.Series(series)
+
+    if pd.api.types.is_datetime64_any_dtype(series):
+        # ستون datetime: موقعیت در جدول همان فاصله روز از ابتدای جدول است
+        offsets = (series.to_numpy().astype("datetime64[D]") - table["start"]).astype("int64")
+        valid = series.notna().to_numpy() & (offsets >= 0) & (offsets < len(table["jalali"]))
+        positions = np.where(valid, offsets, -1)
+    else:
+        positions = table["gregorian_index"].get_indexer(series)
+
+    return _lookup(series, positions, table["jalali"], convert_to_jalali)
+
+
+@profiled()
+def convert_series_to_gregorian(series):
+    """
+    تبدیل برداری یک ستون تاریخ شمسی (متن YYYY/MM/DD) به میلادی.
+    مقادیر نامعتبر مثل تابع convert_to_gregorian بدون تغییر برگردانده می‌شوند.
+    """
+    table = _get_table()
+    positions = table["jalali_index"].get_indexer(pd.Series(series))
+    return _lookup(series, positions, table["gregorian"], convert_to_gregorian)
+
+
+def _normalize_jalali(value):
+    """تاریخ شمسی به شکل YYYY/MM/DD با صفرهای پیشرو؛ None اگر معتبر نباشد"""
+    try:
+        year, month, day = map(int, str(value).split("/"))
+        date = jdatetime.date(year, month, day)
+    except (ValueError, TypeError, OverflowError):
+        return None
+    return f"{date.year:04d}/{date.month:02d}/{date.day:02d}"
+
+
+def normalize_jalali_series(series):
+    """
+    یکسان‌سازی برداری یک ستون تاریخ شمسی به شکل YYYY/MM/DD (مثلاً 1404/7/5 ← 1404/07/05)؛
+    مقایسه‌های متنی بازه تاریخ و ماه فقط با این شکل درست کار می‌کنند.
+    :return: ستون با همان ایندکس؛ تاریخ‌های نامعتبر None می‌شوند
+    """
+    table = _get_table()
+    series = pd.Series(series)
+    valid = table["jalali_index"].get_indexer(series) >= 0
+    result = series.astype(object).copy()
+
+    if not valid.all():
+        # تاریخ‌های بدون صفر پیشرو یا خارج از جدول با jdatetime بررسی می‌شوند
+        result[~valid] = [_normalize_jalali(value) for value in series[~valid]]
+    return result
+
+
+def gregorian_keys(series):
+    """
+    کلید قابل مرتب‌سازی (متن میلادی YYYY/MM/DD) برای یک ستون تاریخ.
+    ستون datetime، متن با - یا / و تاریخ شمسی (سال ۱۳xx و ۱۴xx) پذیرفته می‌شوند؛
+    مقادیر نامعتبر خالی (NaN) می‌شوند.
+    """
+    series = pd.Series(series)
+    if pd.api.types.is_datetime64_any_dtype(series):
+        keys = series.dt.strftime("%Y/%m/%d")
+    else:
+        keys = series.map(
+            lambda value: value.strftime("%Y/%m/%d") if hasattr(value, "strftime") else value
+        ).astype(str).str.strip().str.replace("-", "/").str[:10]
+
+        # تاریخ‌های شمسی به میلادی تبدیل می‌شوند
+        jalali = keys.str.match(r"1[34]\d\d/").to_numpy()
+        if jalali.any():
+            keys[jalali] = convert_series_to_gregorian(keys[jalali]).to_numpy()
+
+    valid = keys.str.fullmatch(r"\d{4}/\d{2}/\d{2}").fillna(False).to_numpy(dtype=bool)
+    return keys.where(valid, None)
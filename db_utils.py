@@ -0,0 +1,747 @@
+import logging
+import os
+import sqlite3
+from contextlib import contextmanager
+
+import pandas as pd
+
+from store_utils import cached_read, cached_query, invalidate, flush
+from export_utils import write_xlsx
+from text_utils import normalize_text
+
+# ---------------------
+# 🗄️ پایگاه داده حساب‌ها و تراکنش‌ها (SQLite)
+# ---------------------
+db_file = "ledger.db"
+
+logger = logging.getLogger(__name__)
+
+# فایل‌های اکسل فقط برای ورود اولیه و خروجی گرفتن استفاده می‌شوند
+banks_file = "banks.xlsx"
+transactions_file = "transactions.xlsx"
+
+BANK_COLUMNS = ["Bank Name", "Balance"]
+TRANSACTION_COLUMNS = ["Bank Name", "Transaction Type", "Amount", "Date", "Purpose", "Person", "Receipt"]
+
+# نگاشت ستون‌های دیتافریم به ستون‌های جدول
+_BANK_FIELDS = dict(zip(BANK_COLUMNS, ["bank_name", "balance"]))
+_TRANSACTION_FIELDS = dict(zip(
+    TRANSACTION_COLUMNS,
+    ["bank_name", "transaction_type", "amount", "date", "purpose", "person", "receipt"]
+))
+
+# تریگرهای هماهنگ نگه داشتن ایندکس FTS با text_records (در نوشتن‌های گروهی موقتاً برداشته می‌شوند)
+TEXT_INDEX_TRIGGERS = {
+    "trg_text_records_insert": """
+CREATE TRIGGER IF NOT EXISTS trg_text_records_insert AFTER INSERT ON text_records
+BEGIN
+    INSERT INTO text_index (rowid, text) VALUES (NEW.id, NEW.text);
+END;""",
+    "trg_text_records_delete": """
+CREATE TRIGGER IF NOT EXISTS trg_text_records_delete AFTER DELETE ON text_records
+BEGIN
+    INSERT INTO text_index (text_index, rowid, text) VALUES ('delete', OLD.id, OLD.text);
+END;""",
+    "trg_text_records_update": """
+CREATE TRIGGER IF NOT EXISTS trg_text_records_update AFTER UPDATE OF text ON text_records
+BEGIN
+    INSERT INTO text_index (text_index, rowid, text) VALUES ('delete', OLD.id, OLD.text);
+    INSERT INTO text_index (rowid, text) VALUES (NEW.id, NEW.text);
+END;""",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS banks (
+    bank_name TEXT PRIMARY KEY,
+    balance REAL NOT NULL DEFAULT 0,
+    -- بخشی از موجودی که با تراکنش‌ها توضیح داده نمی‌شود (موجودی اولیه و اصلاحات دستی)
+    opening_balance REAL
+);
+CREATE TABLE IF NOT EXISTS transactions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    bank_name TEXT NOT NULL,
+    transaction_type TEXT NOT NULL,
+    amount REAL NOT NULL,
+    date TEXT,
+    purpose TEXT,
+    person TEXT,
+    receipt TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_transactions_date ON transactions(date);
+-- ایندکس‌های جستجو؛ تاریخ شمسی YYYY/MM/DD به صورت متنی قابل مرتب‌سازی است
+-- و در کنار هر ستون قرار گرفته تا شرط ستون و بازه تاریخ با یک ایندکس پاسخ داده شود
+DROP INDEX IF EXISTS idx_transactions_bank;
+CREATE INDEX IF NOT EXISTS idx_transactions_bank_date ON transactions(bank_name, date);
+CREATE INDEX IF NOT EXISTS idx_transactions_person_date ON transactions(person, date);
+CREATE INDEX IF NOT EXISTS idx_transactions_type_date ON transactions(transaction_type, date);
+CREATE INDEX IF NOT EXISTS idx_transactions_amount ON transactions(amount);
+-- ایندکس پوششی تطبیق موجودی‌ها: جمع گروهی بانک و نوع بدون مرتب‌سازی و بدون خواندن جدول
+CREATE INDEX IF NOT EXISTS idx_transactions_bank_type_amount ON transactions(bank_name, transaction_type, amount);
+
+-- فهرست ماه‌های شمسی (YYYY/MM) که تراکنش دارند؛ هر ماه یک بازه روی ایندکس تاریخ است
+CREATE TABLE IF NOT EXISTS transaction_months (
+    month TEXT PRIMARY KEY,
+    row_count INTEGER NOT NULL
+);
+CREATE TRIGGER IF NOT EXISTS trg_transaction_months_insert AFTER INSERT ON transactions
+BEGIN
+    INSERT INTO transaction_months (month, row_count) VALUES (COALESCE(substr(NEW.date, 1, 7), ''), 1)
+    ON CONFLICT(month) DO UPDATE SET row_count = row_count + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_transaction_months_delete AFTER DELETE ON transactions
+BEGIN
+    UPDATE transaction_months SET row_count = row_count - 1 WHERE month = COALESCE(substr(OLD.date, 1, 7), '');
+    DELETE FROM transaction_months WHERE month = COALESCE(substr(OLD.date, 1, 7), '') AND row_count <= 0;
+END;
+
+-- جمع مبالغ به تفکیک بانک، نوع تراکنش و روز شمسی؛ با هر ثبت و حذف در O(1) به‌روز می‌شود
+CREATE TABLE IF NOT EXISTS transaction_totals (
+    bank_name TEXT NOT NULL,
+    transaction_type TEXT NOT NULL,
+    day TEXT NOT NULL,
+    total REAL NOT NULL,
+    row_count INTEGER NOT NULL,
+    PRIMARY KEY (bank_name, transaction_type, day)
+);
+CREATE INDEX IF NOT EXISTS idx_transaction_totals_day ON transaction_totals(day);
+CREATE TRIGGER IF NOT EXISTS trg_transaction_totals_insert AFTER INSERT ON transactions
+BEGIN
+    INSERT INTO transaction_totals (bank_name, transaction_type, day, total, row_count)
+    VALUES (NEW.bank_name, NEW.transaction_type, COALESCE(NEW.date, ''), NEW.amount, 1)
+    ON CONFLICT(bank_name, transaction_type, day) DO UPDATE
+    SET total = total + excluded.total, row_count = row_count + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_transaction_totals_delete AFTER DELETE ON transactions
+BEGIN
+    UPDATE transaction_totals SET total = total - OLD.amount, row_count = row_count - 1
+    WHERE bank_name = OLD.bank_name AND transaction_type = OLD.transaction_type AND day = COALESCE(OLD.date, '');
+    DELETE FROM transaction_totals
+    WHERE bank_name = OLD.bank_name AND transaction_type = OLD.transaction_type AND day = COALESCE(OLD.date, '')
+    AND row_count <= 0;
+END;
+
+-- ایندکس متنی (FTS5) همه رکوردها: تراکنش‌ها، چک‌ها، طلبکاران/بدهکاران و شماره‌ها.
+-- text متن یکسان‌شده با normalize_text و display متن اصلی برای نمایش نتیجه است.
+-- یکسان‌سازی در پایتون انجام می‌شود؛ پس ثبت متن تراکنش‌ها در توابع نوشتن است
+-- و فقط حذف آن با تریگر انجام می‌شود.
+CREATE TABLE IF NOT EXISTS text_records (
+    id INTEGER PRIMARY KEY,
+    source TEXT NOT NULL,
+    record_key TEXT NOT NULL,
+    text TEXT NOT NULL,
+    display TEXT,
+    UNIQUE (source, record_key)
+);
+-- منابعی که ایندکس متنی آن‌ها یک بار کامل ساخته شده است
+CREATE TABLE IF NOT EXISTS text_sources (
+    source TEXT PRIMARY KEY
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS text_index USING fts5(
+    text, content='text_records', content_rowid='id', tokenize='unicode61', prefix='2 3'
+);
+{text_index_triggers}
+CREATE TRIGGER IF NOT EXISTS trg_text_transactions_delete AFTER DELETE ON transactions
+BEGIN
+    DELETE FROM text_records WHERE source = 'transactions' AND record_key = CAST(OLD.id AS TEXT);
+END;
+""".replace("{text_index_triggers}", "".join(TEXT_INDEX_TRIGGERS.values()).strip())
+
+# نسخه پایگاه داده در PRAGMA user_version؛ 0 یعنی ورود اولیه از اکسل هنوز انجام نشده
+SCHEMA_VERSION = 1
+
+_initialized = False
+
+
+def _select_list(fields):
+    """ساخت بخش SELECT با نام ستون‌های دیتافریم"""
+    return ", ".join(f'{field} AS "{column}"' for column, field in fields.items())
+
+
+def _clean(value):
+    """تبدیل مقادیر خالی pandas به NULL"""
+    if value is None:
+        return None
+    try:
+        if pd.isna(value):
+            return None
+    except (TypeError, ValueError):
+        pass
+    if hasattr(value, "item"):
+        return value.item()
+    return value
+
+
+def _rows(df, columns):
+    """تبدیل دیتافریم به لیست ردیف‌ها برای executemany"""
+    df = df.reindex(columns=columns)
+    return [tuple(_clean(v) for v in row) for row in df.itertuples(index=False, name=None)]
+
+
+def init_db(conn):
+    """ساخت جداول و ورود داده‌های اکسل قدیمی در اولین اجرا"""
+    # ورود از اکسل فقط یک بار و فقط برای پایگاه داده تازه ساخته‌شده انجام می‌شود؛ خالی بودن
+    # جدول‌ها ملاک نیست چون ممکن است کاربر همه ردیف‌ها را حذف کرده باشد
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    is_new = version == 0 and conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'banks'"
+    ).fetchone() is None
+    conn.executescript(SCHEMA)
+
+    # ستون موجودی اولیه برای پایگاه داده‌هایی که پیش از اضافه شدن آن ساخته شده‌اند
+    migrate_opening = False
+    if "opening_balance" not in [row[1] for row in conn.execute("PRAGMA table_info(banks)")]:
+        conn.execute("ALTER TABLE banks ADD COLUMN opening_balance REAL")
+        migrate_opening = True
+
+    if is_new and os.path.exists(banks_file):
+        insert_banks(conn, pd.read_excel(banks_file))
+        migrate_opening = True
+
+    if is_new and os.path.exists(transactions_file):
+        insert_transactions(conn, pd.read_excel(transactions_file))
+
+    # ساخت فهرست ماه‌ها برای پایگاه داده‌هایی که پیش از اضافه شدن آن ساخته شده‌اند
+    if conn.execute("SELECT COUNT(*) FROM transaction_months").fetchone()[0] == 0:
+        conn.execute(
+            "INSERT INTO transaction_months (month, row_count) "
+            "SELECT COALESCE(substr(date, 1, 7), ''), COUNT(*) FROM transactions GROUP BY 1"
+        )
+    if conn.execute("SELECT COUNT(*) FROM transaction_totals").fetchone()[0] == 0:
+        conn.execute(
+            "INSERT INTO transaction_totals (bank_name, transaction_type, day, total, row_count) "
+            "SELECT bank_name, transaction_type, COALESCE(date, ''), SUM(amount), COUNT(*) "
+            "FROM transactions GROUP BY 1, 2, 3"
+        )
+    if conn.execute("SELECT COUNT(*) FROM text_sources WHERE source = 'transactions'").fetchone()[0] == 0:
+        index_transactions(conn)
+
+    # مهاجرت یک‌باره: موجودی اولیه بانک‌های قدیمی یا واردشده از اکسل از روی تراکنش‌ها
+    if migrate_opening:
+        reset_opening_balances(conn)
+
+    if version < SCHEMA_VERSION:
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+
+@contextmanager
+def get_connection():
+    """
+    اتصال به پایگاه داده در قالب یک تراکنش.
+    در صورت خطا تمام تغییرات برگردانده می‌شوند.
+    """
+    global _initialized
+    # ذخیره کاملی که در صف نوشتن است باید قبل از هر تغییر یا خواندن اعمال شده باشد
+    flush(db_file)
+    conn = sqlite3.connect(db_file)
+    try:
+        with conn:
+            if not _initialized:
+                init_db(conn)
+                _initialized = True
+            yield conn
+    finally:
+        changed = conn.total_changes > 0
+        conn.close()
+        if changed:
+            invalidate(db_file)
+
+
+# ---------------------
+# 📥 خواندن
+# ---------------------
+def _cached_read(loader, name):
+    """خواندن با کش پس از نوشته شدن ذخیره‌های در صف پایگاه داده"""
+    flush(db_file)
+    return cached_read(db_file, loader, name)
+
+
+def _cached_query(loader, name):
+    """مثل _cached_read برای پرس‌وجوهای وابسته به ورودی کاربر، با کش محدود"""
+    flush(db_file)
+    return cached_query(db_file, loader, name)
+
+
+def load_banks():
+    """بارگذاری لیست بانک‌ها (با کش)"""
+    def loader():
+        with get_connection() as conn:
+            return pd.read_sql_query(
+                f"SELECT {_select_list(_BANK_FIELDS)} FROM banks ORDER BY rowid", conn
+            )
+
+    return _cached_read(loader, "banks")
+
+
+def load_transactions():
+    """بارگذاری تراکنش‌ها (با کش)؛ ایندکس دیتافریم همان شناسه تراکنش در پایگاه داده است"""
+    def loader():
+        with get_connection() as conn:
+            df = pd.read_sql_query(
+                f"SELECT id, {_select_list(_TRANSACTION_FIELDS)} FROM transactions ORDER BY id",
+                conn, index_col="id"
+            )
+        df.index.name = None
+        return df
+
+    return _cached_read(loader, "transactions")
+
+
+def load_transactions_between(start_date, end_date):
+    """
+    بارگذاری تراکنش‌های یک بازه تاریخ شمسی (YYYY/MM/DD) با استفاده از ایندکس تاریخ
+    :return: دیتافریم با همان ستون‌های load_transactions
+    """
+    def loader():
+        with get_connection() as conn:
+            df = pd.read_sql_query(
+                f"SELECT id, {_select_list(_TRANSACTION_FIELDS)} FROM transactions "
+                "WHERE date BETWEEN ? AND ? ORDER BY id",
+                conn, params=(start_date, end_date), index_col="id"
+            )
+        df.index.name = None
+        return df
+
+    return _cached_query(loader, f"transactions:{start_date}:{end_date}")
+
+
+def iter_transactions(transaction_type=None, start_date=None, end_date=None, chunk_rows=10000):
+    """
+    تراکنش‌ها به ترتیب تاریخ، تکه‌تکه و بدون بارگذاری کل جدول (برای خروجی‌های بزرگ).
+    ترتیب از ایندکس تاریخ (یا نوع و تاریخ) خوانده می‌شود و مرتب‌سازی جداگانه‌ای لازم نیست.
+    :param start_date: تاریخ شمسی YYYY/MM/DD (None یعنی از ابتدا)
+    :param end_date: تاریخ شمسی YYYY/MM/DD (None یعنی تا انتها)
+    :return: مولد دیتافریم‌هایی با حداکثر chunk_rows ردیف و ستون‌های load_transactions
+    """
+    conditions, params = [], []
+    if transaction_type is not None:
+        conditions.append("transaction_type = ?")
+        params.append(transaction_type)
+    if start_date is not None:
+        conditions.append("date >= ?")
+        params.append(start_date)
+    if end_date is not None:
+        conditions.append("date <= ?")
+        params.append(end_date)
+    where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+
+    with get_connection() as conn:
+        yield from pd.read_sql_query(
+            f"SELECT {_select_list(_TRANSACTION_FIELDS)} FROM transactions{where} ORDER BY date, id",
+            conn, params=params, chunksize=chunk_rows
+        )
+
+
+# یک شرط وقتی «انتخابی» است که کمتر از این تعداد ردیف از ایندکس آن برگردد
+SEARCH_SELECTIVE_ROWS = 50000
+
+
+def _search_conditions(bank_name, person, transaction_type, start_date, end_date, min_amount, max_amount):
+    """
+    شرط‌های جستجو به تفکیک ایندکس
+    :return: (لیست (نام ایندکس، شرط، پارامترها), شرط کامل، پارامترهای شرط کامل)
+    """
+    date_sql, date_params = [], []
+    if start_date:
+        date_sql.append("date >= ?")
+        date_params.append(start_date)
+    if end_date:
+        date_sql.append("date <= ?")
+        date_params.append(end_date)
+
+    indexed = []
+    if bank_name:
+        indexed.append(("idx_transactions_bank_date", ["bank_name = ?"] + date_sql, [bank_name] + date_params))
+    if person:
+        # جستجوی پیشوندی به صورت بازه تا از ایندکس استفاده شود
+        indexed.append((
+            "idx_transactions_person_date", ["person >= ?", "person < ?"] + date_sql,
+            [person, person + "\U0010ffff"] + date_params
+        ))
+    if transaction_type:
+        indexed.append(("idx_transactions_type_date", ["transaction_type = ?"] + date_sql, [transaction_type] + date_params))
+    amount_sql, amount_params = [], []
+    if min_amount is not None:
+        amount_sql.append("amount >= ?")
+        amount_params.append(float(min_amount))
+    if max_amount is not None:
+        amount_sql.append("amount <= ?")
+        amount_params.append(float(max_amount))
+    if amount_sql:
+        indexed.append(("idx_transactions_amount", amount_sql, amount_params))
+    if date_sql:
+        indexed.append(("idx_transactions_date", date_sql, date_params))
+
+    # شرط کامل؛ شرط تاریخ که در چند ایندکس تکرار شده فقط یک بار می‌آید
+    where, params = [], []
+    for _, conditions, condition_params in indexed:
+        for condition, param in zip(conditions, condition_params):
+            if condition not in where:
+                where.append(condition)
+                params.append(param)
+    return [(index, " AND ".join(c), p) for index, c, p in indexed], " AND ".join(where), params
+
+
+def search_transactions(bank_name=None, person=None, transaction_type=None,
+                        start_date=None, end_date=None, min_amount=None, max_amount=None, limit=1000):
+    """
+    جستجوی چندشرطی تراکنش‌ها با ایندکس‌ها؛ شرط‌های None نادیده گرفته می‌شوند.
+    برای هر شرط تعداد ردیف‌های ایندکس آن (حداکثر تا SEARCH_SELECTIVE_ROWS) شمرده می‌شود؛
+    شناسه‌های شرط‌های انتخابی از ایندکس خودشان خوانده و با INTERSECT اشتراک گرفته می‌شوند
+    و فقط همان ردیف‌ها خوانده می‌شوند. اگر هیچ شرطی انتخابی نباشد، ردیف‌ها به ترتیب
+    ایندکس تاریخ خوانده می‌شوند تا تعداد limit نتیجه پیدا شود.
+    :param person: نام شخص یا ابتدای آن
+    :param start_date: ابتدای بازه تاریخ شمسی (YYYY/MM/DD)
+    :param end_date: انتهای بازه تاریخ شمسی
+    :param limit: حداکثر تعداد نتیجه، از جدیدترین تاریخ
+    :return: دیتافریم با همان ستون‌های load_transactions
+    """
+    indexed, where, params = _search_conditions(
+        bank_name, person, transaction_type, start_date, end_date, min_amount, max_amount
+    )
+
+    def loader():
+        with get_connection() as conn:
+            selective = []
+            for index, condition, condition_params in indexed:
+                count = conn.execute(
+                    f"SELECT COUNT(*) FROM (SELECT 1 FROM transactions INDEXED BY {index} "
+                    f"WHERE {condition} LIMIT {SEARCH_SELECTIVE_ROWS})",
+                    condition_params
+                ).fetchone()[0]
+                if count < SEARCH_SELECTIVE_ROWS:
+                    selective.append((index, condition, condition_params))
+
+            query = f"SELECT id, {_select_list(_TRANSACTION_FIELDS)} FROM transactions"
+            query_params = []
+            if selective:
+                ids = " INTERSECT ".join(
+                    f"SELECT id FROM transactions INDEXED BY {index} WHERE {condition}"
+                    for index, condition, _ in selective
+                )
+                # NOT INDEXED: ردیف‌ها فقط با شناسه خوانده شوند، نه با پیمایش ایندکس دیگری
+                query += f" NOT INDEXED WHERE id IN ({ids}) AND {where}"
+                query_params = [p for _, _, condition_params in selective for p in condition_params] + params
+            elif where:
+                query += f" WHERE {where}"
+                query_params = params
+
+            df = pd.read_sql_query(
+                query + " ORDER BY date DESC, id DESC LIMIT ?",
+                conn, params=query_params + [int(limit)], index_col="id"
+            )
+        df.index.name = None
+        return df
+
+    return _cached_query(loader, f"search:{where}:{params}:{limit}")
+
+
+def search_text(match, limit=200):
+    """
+    جستجو در ایندکس متنی همه منابع، از جدیدترین رکورد ثبت‌شده
+    :param match: عبارت MATCH ساخته شده با text_utils.match_query
+    :return: دیتافریم با ستون‌های Source، Key و Display
+    """
+    def loader():
+        with get_connection() as conn:
+            return pd.read_sql_query(
+                'SELECT r.source AS "Source", r.record_key AS "Key", r.display AS "Display" '
+                "FROM text_index JOIN text_records r ON r.id = text_index.rowid "
+                "WHERE text_index MATCH ? ORDER BY text_index.rowid DESC LIMIT ?",
+                conn, params=(match, int(limit))
+            )
+
+    return _cached_query(loader, f"text:{match}:{limit}")
+
+
+def load_text_sources():
+    """منابعی که ایندکس متنی آن‌ها ساخته شده است"""
+    with get_connection() as conn:
+        return {row[0] for row in conn.execute("SELECT source FROM text_sources")}
+
+
+def load_history_sums():
+    """
+    جمع مبالغ و تعداد تراکنش‌ها به تفکیک بانک و نوع، مستقیماً از جدول تراکنش‌ها
+    (نه از جدول جمع‌ها) با یک پیمایش ایندکس پوششی
+    :return: دیتافریم با ستون‌های Bank Name، Transaction Type، Amount و Count
+    """
+    def loader():
+        with get_connection() as conn:
+            return pd.read_sql_query(
+                'SELECT bank_name AS "Bank Name", transaction_type AS "Transaction Type", '
+                'SUM(amount) AS "Amount", COUNT(*) AS "Count" '
+                "FROM transactions INDEXED BY idx_transactions_bank_type_amount GROUP BY bank_name, transaction_type",
+                conn
+            )
+
+    return _cached_read(loader, "history_sums")
+
+
+def load_opening_balances():
+    """
+    موجودی ثبت‌شده و موجودی اولیه بانک‌ها
+    :return: دیتافریم با ستون‌های Bank Name، Balance و Opening Balance
+    """
+    def loader():
+        with get_connection() as conn:
+            return pd.read_sql_query(
+                'SELECT bank_name AS "Bank Name", balance AS "Balance", opening_balance AS "Opening Balance" '
+                "FROM banks ORDER BY rowid",
+                conn
+            )
+
+    return _cached_read(loader, "opening_balances")
+
+
+def load_transaction_months():
+    """لیست ماه‌های شمسی (YYYY/MM) دارای تراکنش، از جدیدترین، با تعداد تراکنش هر ماه"""
+    def loader():
+        with get_connection() as conn:
+            return pd.read_sql_query(
+                'SELECT month AS "Month", row_count AS "Count" FROM transaction_months '
+                "WHERE month != '' ORDER BY month DESC", conn
+            )
+
+    return _cached_read(loader, "transaction_months")
+
+
+def load_totals(start_date=None, end_date=None):
+    """
+    جمع مبالغ به تفکیک بانک و نوع تراکنش از جدول جمع‌های روزانه
+    :param start_date: ابتدای بازه تاریخ شمسی (None یعنی از ابتدا)
+    :param end_date: انتهای بازه تاریخ شمسی (None یعنی تا انتها)
+    :return: دیتافریم با ستون‌های Bank Name، Transaction Type و Amount
+    """
+    def loader():
+        query = (
+            'SELECT bank_name AS "Bank Name", transaction_type AS "Transaction Type", '
+            'SUM(total) AS "Amount" FROM transaction_totals'
+        )
+        params = ()
+        if start_date is not None and end_date is not None:
+            query += " WHERE day BETWEEN ? AND ?"
+            params = (start_date, end_date)
+        with get_connection() as conn:
+            return pd.read_sql_query(query + " GROUP BY 1, 2", conn, params=params)
+
+    return _cached_query(loader, f"totals:{start_date}:{end_date}")
+
+
+# ---------------------
+# 📤 نوشتن تک‌ردیفی
+# ---------------------
+def insert_bank(conn, bank_name, balance):
+    """ثبت بانک جدید؛ موجودی اولیه همان موجودی هنگام ایجاد است"""
+    conn.execute(
+        "INSERT INTO banks (bank_name, balance, opening_balance) VALUES (?, ?, ?)",
+        (bank_name, _clean(balance), _clean(balance))
+    )
+
+
+def set_balance(conn, bank_name, balance):
+    """به‌روزرسانی موجودی یک بانک"""
+    conn.execute("UPDATE banks SET balance = ? WHERE bank_name = ?", (_clean(balance), bank_name))
+
+
+def adjust_opening_balance(conn, bank_name, delta):
+    """ثبت اصلاح دستی موجودی (بدون تراکنش) در موجودی اولیه"""
+    conn.execute(
+        "UPDATE banks SET opening_balance = COALESCE(opening_balance, 0) + ? WHERE bank_name = ?",
+        (_clean(delta), bank_name)
+    )
+
+
+def insert_transaction(conn, bank_name, transaction_type, amount, date, purpose, person, receipt):
+    """ثبت یک تراکنش و بازگرداندن شناسه آن"""
+    cursor = conn.execute(
+        "INSERT INTO transactions (bank_name, transaction_type, amount, date, purpose, person, receipt) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+        tuple(_clean(v) for v in (bank_name, transaction_type, amount, date, purpose, person, receipt))
+    )
+    index_transactions(conn, cursor.lastrowid)
+    return cursor.lastrowid
+
+
+def delete_transaction_rows(conn, transaction_ids):
+    """حذف گروهی تراکنش‌ها با شناسه"""
+    conn.executemany("DELETE FROM transactions WHERE id = ?", [(int(i),) for i in transaction_ids])
+
+
+# ---------------------
+# 📦 نوشتن گروهی
+# ---------------------
+def insert_banks(conn, df_banks):
+    """ثبت گروهی بانک‌ها"""
+    conn.executemany(
+        "INSERT INTO banks (bank_name, balance) VALUES (?, ?)",
+        _rows(df_banks, BANK_COLUMNS)
+    )
+
+
+def insert_transactions(conn, df_transactions, keep_ids=False):
+    """
+    ثبت گروهی تراکنش‌ها
+    :param keep_ids: اگر True باشد ایندکس دیتافریم به عنوان شناسه تراکنش ذخیره می‌شود
+    """
+    last_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM transactions").fetchone()[0]
+    rows = _rows(df_transactions, TRANSACTION_COLUMNS)
+    if keep_ids:
+        rows = [(int(i),) + row for i, row in zip(df_transactions.index, rows)]
+        conn.executemany(
+            "INSERT INTO transactions (id, bank_name, transaction_type, amount, date, purpose, person, receipt) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            rows
+        )
+    else:
+        conn.executemany(
+            "INSERT INTO transactions (bank_name, transaction_type, amount, date, purpose, person, receipt) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            rows
+        )
+    index_transactions(conn, after_id=last_id)
+
+
+def replace_all(df_banks, df_transactions):
+    """جایگزینی کامل جداول بانک‌ها و تراکنش‌ها در یک تراکنش پایگاه داده"""
+    with get_connection() as conn:
+        # موجودی اولیه بانک‌های باقی‌مانده حفظ می‌شود تا مغایرت‌ها در تطبیق موجودی دیده شوند
+        openings = conn.execute("SELECT bank_name, opening_balance FROM banks").fetchall()
+        conn.execute("DELETE FROM banks")
+        insert_banks(conn, df_banks)
+        conn.executemany("UPDATE banks SET opening_balance = ? WHERE bank_name = ?", [(o, b) for b, o in openings])
+        with bulk_text_index(conn):
+            conn.execute("DELETE FROM transactions")
+            insert_transactions(conn, df_transactions, keep_ids=df_transactions.index.is_unique)
+        # بانک‌های تازه موجودی اولیه ندارند؛ موجودی فعلی آن‌ها درست فرض می‌شود
+        reset_opening_balances(conn)
+
+
+def reset_opening_balances(conn):
+    """
+    موجودی اولیه بانک‌هایی که موجودی اولیه ندارند (بانک‌های قدیمی یا تازه واردشده) برابر موجودی
+    فعلی منهای خالص تراکنش‌ها می‌شود، یعنی موجودی فعلی درست فرض می‌شود.
+    بانک‌هایی که موجودی اولیه دارند تغییر نمی‌کنند؛ مقادیر ثبت‌شده در لاگ نوشته می‌شوند.
+    :return: دیکشنری نام بانک ← موجودی اولیه ثبت‌شده
+    """
+    openings = dict(conn.execute(
+        "UPDATE banks SET opening_balance = balance - COALESCE(("
+        "SELECT SUM(CASE transaction_type WHEN 'واریز' THEN total WHEN 'برداشت' THEN -total ELSE 0 END) "
+        "FROM transaction_totals WHERE transaction_totals.bank_name = banks.bank_name), 0) "
+        "WHERE opening_balance IS NULL RETURNING bank_name, opening_balance"
+    ).fetchall())
+    for bank_name, opening in openings.items():
+        logger.info("Opening balance of %s set to %s from current balance and transactions", bank_name, f"{opening:,.0f}")
+    return openings
+
+
+# ---------------------
+# 🔤 ایندکس متنی
+# ---------------------
+_UPSERT_TEXT = (
+    "INSERT INTO text_records (source, record_key, text, display) VALUES (?, ?, ?, ?) "
+    "ON CONFLICT(source, record_key) DO UPDATE SET text = excluded.text, display = excluded.display"
+)
+
+
+# از این تعداد ردیف به بالا ایندکس FTS به جای تریگرهای ردیفی یک‌جا بازسازی می‌شود
+TEXT_BULK_ROWS = 10000
+
+
+@contextmanager
+def bulk_text_index(conn, enabled=True):
+    """
+    نوشتن گروهی در text_records بدون تریگرهای ردیفی FTS؛ در پایان ایندکس FTS
+    یک بار از روی text_records بازسازی می‌شود که برای هزاران ردیف بسیار سریع‌تر است.
+    """
+    # داخل یک نوشتن گروهی دیگر (تریگرها قبلاً برداشته شده‌اند)
+    active = conn.execute(
+        "SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger' AND name = 'trg_text_records_insert'"
+    ).fetchone()[0]
+    if not enabled or not active:
+        yield
+        return
+    for name in TEXT_INDEX_TRIGGERS:
+        conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+    yield
+    conn.execute("INSERT INTO text_index (text_index) VALUES ('rebuild')")
+    for sql in TEXT_INDEX_TRIGGERS.values():
+        conn.execute(sql)
+
+
+def index_transactions(conn, transaction_id=None, after_id=None):
+    """
+    ثبت متن تراکنش‌ها (علت و شخص) در ایندکس متنی
+    :param transaction_id: فقط این تراکنش
+    :param after_id: فقط تراکنش‌های با شناسه بزرگ‌تر (None یعنی همه)
+    """
+    query = "SELECT id, date, bank_name, purpose, person FROM transactions"
+    params = ()
+    if transaction_id is not None:
+        query, params = query + " WHERE id = ?", (int(transaction_id),)
+    elif after_id is not None:
+        query, params = query + " WHERE id > ?", (int(after_id),)
+
+    rows = [
+        ("transactions", str(i), normalize_text(f"{purpose or ''} {person or ''}"),
+         " - ".join(str(v) for v in (date, bank_name, purpose, person) if v))
+        for i, date, bank_name, purpose, person in conn.execute(query, params)
+    ]
+    with bulk_text_index(conn, len(rows) >= TEXT_BULK_ROWS):
+        conn.executemany(_UPSERT_TEXT, rows)
+    if transaction_id is None and after_id is None:
+        conn.execute("INSERT OR IGNORE INTO text_sources (source) VALUES ('transactions')")
+
+
+def upsert_text_records(source, records):
+    """
+    ثبت یا به‌روزرسانی متن چند رکورد یک منبع در ایندکس متنی
+    :param records: دیتافریم با ایندکس کلید رکورد و ستون‌های Text و Display
+    """
+    with get_connection() as conn:
+        conn.executemany(_UPSERT_TEXT, [
+            (source, str(key), text, display)
+            for key, text, display in zip(records.index, records["Text"], records["Display"])
+        ])
+
+
+def delete_text_records(source, keys):
+    """حذف متن چند رکورد یک منبع از ایندکس متنی"""
+    with get_connection() as conn:
+        conn.executemany(
+            "DELETE FROM text_records WHERE source = ? AND record_key = ?",
+            [(source, str(key)) for key in keys]
+        )
+
+
+def sync_text_records(source, records):
+    """
+    جایگزینی کامل متن یک منبع در ایندکس متنی؛ فقط رکوردهای تغییرکرده و حذف‌شده نوشته می‌شوند
+    :param records: دیتافریم با ایندکس کلید رکورد و ستون‌های Text و Display
+    """
+    with get_connection() as conn:
+        existing = {
+            key: (text, display) for key, text, display in
+            conn.execute("SELECT record_key, text, display FROM text_records WHERE source = ?", (source,))
+        }
+        changed = []
+        for key, text, display in zip(records.index, records["Text"], records["Display"]):
+            if existing.pop(str(key), None) != (text, display):
+                changed.append((source, str(key), text, display))
+        with bulk_text_index(conn, len(existing) + len(changed) >= TEXT_BULK_ROWS):
+            conn.executemany(
+                "DELETE FROM text_records WHERE source = ? AND record_key = ?",
+                [(source, key) for key in existing]
+            )
+            conn.executemany(_UPSERT_TEXT, changed)
+        conn.execute("INSERT OR IGNORE INTO text_sources (source) VALUES (?)", (source,))
+
+
+# ---------------------
+# 📄 خروجی اکسل
+# ---------------------
+def export_to_excel():
+    """خروجی گرفتن از بانک‌ها و تراکنش‌ها در فایل‌های اکسل"""
+    load_banks().to_excel(banks_file, index=False)
+    # تراکنش‌ها تکه‌تکه در کارپوشه write_only نوشته می‌شوند تا کل جدول در حافظه ساخته نشود
+    with open(transactions_file, "wb") as f:
+        write_xlsx(f, dict(zip(TRANSACTION_COLUMNS, TRANSACTION_COLUMNS)), iter_transactions())
@@ -1,110 +1,116 @@
 import streamlit as st
-import pandas as pd
 from datetime import datetime
-import os
-import jdatetime
-from PIL import Image
-import io
+import uuid
+from store_utils import (
+    load_table, load_sums, save_table, append_record,
+    delete_records, assign_ids, load_id_index, rows_due_between
+)
+from date_utils import convert_to_jalali, convert_to_gregorian, convert_series_to_jalali
+from format_utils import format_currency, format_currency_series
+from ui_utils import paginate
+from profiling_utils import profiled
+from export_utils import due_date_chunks, export_widget
 
 debts_file = "debts.xlsx"
-def format_currency(amount):
-    """فرمت کردن مبلغ با کاما برای نمایش"""
-    try:
-        return "{:,.0f}".format(float(amount))
-    except:
-        return amount
-
-def parse_currency(amount_str):
-    """تبدیل مبلغ فرمت شده به عدد برای ذخیره"""
-    try:
-        return float(str(amount_str).replace(",", "").strip())
-    except:
-        return 0.0
-
-def convert_to_jalali(gregorian_date):
-    """تبدیل تاریخ میلادی به شمسی"""
-    try:
-        if isinstance(gregorian_date, str):
-            gregorian_date = datetime.strptime(gregorian_date, "%Y/%m/%d")
-        jalali_date = jdatetime.date.fromgregorian(date=gregorian_date)
-        return jalali_date.strftime("%Y/%m/%d")
-    except:
-        return gregorian_date
+debts_columns = [
+    "ID", "Type", "Name", "Amount", "Description", 
+    "Due Date", "Contact", "Registered Date"
+]
+@profiled(debts_file)
+def load_debts_data():
+    """بارگذاری داده‌های طلبکاران/بدهکاران؛ رکوردهای قدیمی بدون شناسه یک بار شناسه دائمی می‌گیرند"""
+    df_debts, added = assign_ids(load_table(debts_file, debts_columns))
+    if added:
+        save_debts_data(df_debts)
+    return df_debts
 
-def convert_to_gregorian(jalali_date_str):
-    """تبدیل تاریخ شمسی به میلادی"""
-    try:
-        year, month, day = map(int, jalali_date_str.split('/'))
-        gregorian_date = jdatetime.date(year, month, day).togregorian()
-        return gregorian_date.strftime("%Y/%m/%d")
-    except:
-        return jalali_date_str
+@profiled(debts_file)
+def debt_totals():
+    """جمع مبالغ به تفکیک طلبکار/بدهکار؛ با هر ثبت یا حذف فقط همان رکورد اعمال می‌شود"""
+    return load_sums(debts_file, debts_columns, "Type")
 
-def save_image(uploaded_file, directory, filename):
-    """ذخیره تصویر آپلود شده"""
-    try:
-        file_path = os.path.join(directory, filename)
-        with open(file_path, "wb") as f:
-            f.write(uploaded_file.getbuffer())
-        return file_path
-    except Exception as e:
-        st.error(f"خطا در ذخیره تصویر: {str(e)}")
-        return None
+@profiled(debts_file)
+def debts_due_between(start_date=None, end_date=None):
+    """طلبکاران/بدهکارانی که تاریخ سررسیدشان در بازه میلادی است، به ترتیب تاریخ"""
+    return rows_due_between(debts_file, debts_columns, load_debts_data, start_date, end_date)
 
-def load_debts_data():
-    """بارگذاری داده‌های طلبکاران/بدهکاران"""
-    if os.path.exists(debts_file):
-        df_debts = pd.read_excel(debts_file)
-    else:
-        df_debts = pd.DataFrame(columns=[
-            "Type", "Name", "Amount", "Description", 
-            "Due Date", "Contact", "Registered Date"
-        ])
-    return df_debts
+# ستون‌های فایل خروجی طلبکاران/بدهکاران
+DEBT_EXPORT_COLUMNS = {
+    "Type": "نوع", "Name": "نام", "Amount": "مبلغ", "Description": "توضیحات",
+    "Due Date": "تاریخ وصول", "Contact": "اطلاعات تماس", "Registered Date": "تاریخ ثبت",
+}
 
+@profiled(debts_file)
 def save_debts_data(df_debts):
     """ذخیره داده‌های طلبکاران/بدهکاران"""
-    df_debts.to_excel(debts_file, index=False)
+    save_table(debts_file, df_debts)
+    from search_utils import index_table
+    index_table("debts", df_debts)
 
+@profiled(debts_file)
 def register_debt(debt_type, name, amount, description, due_date, contact):
     """ثبت طلبکار/بدهکار جدید"""
     try:
-        df_debts = load_debts_data()
-        
         # تبدیل تاریخ به میلادی برای ذخیره سازی
         gregorian_due_date = convert_to_gregorian(due_date)
         current_date = convert_to_jalali(datetime.now().strftime("%Y/%m/%d"))
         gregorian_registered_date = convert_to_gregorian(current_date)
         
-        # ثبت رکورد جدید
-        new_debt = pd.DataFrame([[
-            debt_type, name, amount, description,
-            gregorian_due_date, contact, gregorian_registered_date
-        ]], columns=[
-            "Type", "Name", "Amount", "Description", 
-            "Due Date", "Contact", "Registered Date"
-        ])
-        
-        df_debts = pd.concat([df_debts, new_debt], ignore_index=True)
-        save_debts_data(df_debts)
+        # ثبت رکورد جدید در ژورنال و ایندکس متنی
+        row = {
+            "ID": str(uuid.uuid4()), "Type": debt_type, "Name": name, "Amount": amount,
+            "Description": description, "Due Date": gregorian_due_date,
+            "Contact": contact, "Registered Date": gregorian_registered_date
+        }
+        append_record(debts_file, row)
+        from search_utils import index_record
+        index_record("debts", row)
         
         return True, current_date
     except Exception as e:
         return False, str(e)
 
-def delete_debt(index):
+def delete_debt(debt_id):
     """حذف طلبکار/بدهکار"""
+    return delete_debts([debt_id])
+
+@profiled(debts_file)
+def delete_debts(debt_ids):
+    """
+    حذف گروهی طلبکاران/بدهکاران با شناسه؛ فقط یک tombstone به ژورنال اضافه می‌شود
+    و جدول خوانده یا دوباره نوشته نمی‌شود
+    """
     try:
-        df_debts = load_debts_data()
-        if 0 <= index < len(df_debts):
-            df_debts = df_debts.drop(index).reset_index(drop=True)
-            save_debts_data(df_debts)
-            return True
-        return False
+        ids = load_id_index(debts_file, debts_columns)
+        debt_ids = [str(i) for i in debt_ids if str(i) in ids]
+        if not debt_ids:
+            return False
+        delete_records(debts_file, debt_ids)
+        from search_utils import unindex_records
+        unindex_records("debts", debt_ids)
+        return True
     except Exception as e:
         st.error(f"خطا در حذف رکورد: {str(e)}")
         return False
 
+def debts_display_frame(df_debts):
+    """آماده‌سازی ردیف‌ها برای نمایش: ایندکس شناسه، تاریخ شمسی، مبلغ فرمت‌شده و نام ستون‌های فارسی"""
+    # تبدیل تاریخ‌ها به شمسی برای نمایش؛ شناسه به ایندکس منتقل می‌شود
+    display_df = df_debts.set_index("ID")
+    display_df["Due Date"] = convert_series_to_jalali(display_df["Due Date"])
+    display_df["Registered Date"] = convert_series_to_jalali(display_df["Registered Date"])
+    
+    # تغییر نام ستون‌ها به فارسی
+    display_df.columns = [
+        "نوع", "نام", "مبلغ", "توضیحات", 
+        "تاریخ وصول", "اطلاعات تماس", "تاریخ ثبت"
+    ]
+    
+    # فرمت کردن مبلغ
+    display_df["مبلغ"] = format_currency_series(display_df["مبلغ"])
+    return display_df
+
+@profiled(debts_file)
 def display_debts():
     """نمایش لیست طلبکاران/بدهکاران"""
     df_debts = load_debts_data()
@@ -113,48 +119,63 @@ def display_debts():
         st.info("هیچ رکوردی ثبت نشده است.")
         return
     
-    # تبدیل تاریخ‌ها به شمسی برای نمایش
-    display_df = df_debts.copy()
-    display_df["Due Date"] = display_df["Due Date"].apply(convert_to_jalali)
-    display_df["Registered Date"] = display_df["Registered Date"].apply(convert_to_jalali)
+    # فیلتر، مرتب‌سازی و برش صفحه جاری؛ بقیه پردازش‌ها فقط روی همین صفحه انجام می‌شود
+    page_df = paginate(
+        df_debts, "debts",
+        sort_columns={"نام": "Name", "مبلغ": "Amount", "تاریخ وصول": "Due Date", "نوع": "Type"},
+        search_columns=["Name", "Description", "Contact"]
+    )
     
-    # تغییر نام ستون‌ها به فارسی
-    display_df.columns = [
-        "نوع", "نام", "مبلغ", "توضیحات", 
-        "تاریخ وصول", "اطلاعات تماس", "تاریخ ثبت"
-    ]
-    
-    # فرمت کردن مبلغ
-    display_df["مبلغ"] = display_df["مبلغ"].apply(format_currency)
+    display_df = debts_display_frame(page_df)
     
     # نمایش جدول با امکان حذف
-    for i in range(len(display_df)):
-        cols = st.columns([5, 5, 3, 3, 3, 3, 3, 1])
+    selected = []
+    for i in display_df.index:
+        cols = st.columns([1, 5, 5, 3, 3, 3, 3, 3, 1])
         with cols[0]:
-            st.text(display_df.loc[i, "نوع"])
+            if st.checkbox("انتخاب", key=f"select_{i}", label_visibility="collapsed"):
+                selected.append(i)
         with cols[1]:
-            st.text(display_df.loc[i, "نام"])
+            st.text(display_df.loc[i, "نوع"])
         with cols[2]:
-            st.text(display_df.loc[i, "مبلغ"])
+            st.text(display_df.loc[i, "نام"])
         with cols[3]:
-            st.text(display_df.loc[i, "توضیحات"])
+            st.text(display_df.loc[i, "مبلغ"])
         with cols[4]:
-            st.text(display_df.loc[i, "تاریخ وصول"])
+            st.text(display_df.loc[i, "توضیحات"])
         with cols[5]:
-            st.text(display_df.loc[i, "اطلاعات تماس"])
+            st.text(display_df.loc[i, "تاریخ وصول"])
         with cols[6]:
-            st.text(display_df.loc[i, "تاریخ ثبت"])
+            st.text(display_df.loc[i, "اطلاعات تماس"])
         with cols[7]:
+            st.text(display_df.loc[i, "تاریخ ثبت"])
+        with cols[8]:
             if st.button("🗑️", key=f"del_{i}"):
                 if delete_debt(i):
                     st.rerun()
     
-    # محاسبه جمع مبالغ
-    total_creditors = df_debts[df_debts["Type"] == "طلبکار"]["Amount"].sum()
-    total_debtors = df_debts[df_debts["Type"] == "بدهکار"]["Amount"].sum()
+    # حذف گروهی ردیف‌های انتخاب‌شده
+    if selected and st.button(f"حذف {len(selected)} رکورد انتخاب‌شده", key="delete_selected_debts"):
+        if delete_debts(selected):
+            st.rerun()
+    
+    # جمع مبالغ از جمع‌های نگهداری‌شده خوانده می‌شود
+    totals = debt_totals()
+    total_creditors = totals.get("طلبکار", 0)
+    total_debtors = totals.get("بدهکار", 0)
     
     st.markdown(f"""
     **جمع کل طلبکاران:** {format_currency(total_creditors)} ریال  
     **جمع کل بدهکاران:** {format_currency(total_debtors)} ریال  
     **مانده:** {format_currency(total_creditors - total_debtors)} ریال
-    """)
\ No newline at end of file
+    """)
+    
+    # خروجی کل رکوردها (یا یک بازه تاریخ وصول) بدون ساخت جدول کامل در حافظه
+    export_widget(
+        "debts", DEBT_EXPORT_COLUMNS,
+        lambda start_date, end_date: due_date_chunks(
+            debts_file, debts_columns, load_debts_data, start_date, end_date,
+            {"Registered Date": convert_series_to_jalali},
+        ),
+        "debts",
+    )
\ No newline at end of file
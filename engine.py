@@ -1,7 +1,12 @@
 # engine.py
 import pandas as pd
 import jdatetime
-from datetime import datetime
+from contextlib import contextmanager
+import db_utils
+from store_utils import enqueue_write
+from date_utils import normalize_jalali_series
+from format_utils import LATIN_DIGITS
+from profiling_utils import profiled
 
 def get_today_jalali_str():
     """تاریخ امروز به فرمت شمسی (yyyy/mm/dd)"""
@@ -12,63 +17,458 @@ def filter_today_transactions(df):
     today_jalali = get_today_jalali_str()
     return df[df["Date"] == today_jalali].copy()
 
+@profiled(db_utils.db_file)
+def load_today_transactions():
+    """بارگذاری فقط تراکنش‌های امروز از پایگاه داده"""
+    today_jalali = get_today_jalali_str()
+    return db_utils.load_transactions_between(today_jalali, today_jalali)
+
+@profiled(db_utils.db_file)
+def load_month_transactions(month):
+    """بارگذاری تراکنش‌های یک ماه شمسی (YYYY/MM)"""
+    return db_utils.load_transactions_between(f"{month}/01", f"{month}/31")
+
+
+@profiled(db_utils.db_file)
+def load_data():
+    """بارگذاری بانک‌ها و تراکنش‌ها از پایگاه داده"""
+    return db_utils.load_banks(), db_utils.load_transactions()
+
+@profiled(db_utils.db_file)
+def save_data(df_banks, df_transactions):
+    """
+    ذخیره کامل بانک‌ها و تراکنش‌ها در پایگاه داده، در پس‌زمینه.
+    خواندن و تغییرات بعدی پایگاه داده تا پایان این ذخیره صبر می‌کنند.
+    برای تغییرات تک‌ردیفی از add_bank، add_transaction و delete_transaction استفاده کنید.
+    """
+    enqueue_write(db_utils.db_file, (df_banks, df_transactions), lambda path, data: db_utils.replace_all(*data))
+
+@profiled(db_utils.db_file)
+def transaction_totals(start_date=None, end_date=None):
+    """
+    جمع کل واریزها و برداشت‌ها از جدول جمع‌های روزانه، بدون پیمایش تراکنش‌ها
+    :param start_date: ابتدای بازه تاریخ شمسی (None یعنی کل تاریخچه)
+    :param end_date: انتهای بازه تاریخ شمسی
+    :return: (جمع واریزها, جمع برداشت‌ها)
+    """
+    df = db_utils.load_totals(start_date, end_date)
+    totals = df.groupby("Transaction Type")["Amount"].sum()
+    return totals.get("واریز", 0), totals.get("برداشت", 0)
+
+@profiled(db_utils.db_file)
+def bank_totals():
+    """
+    جمع واریزها و برداشت‌های هر بانک
+    :return: دیتافریم با ایندکس نام بانک و ستون‌های واریز و برداشت
+    """
+    df = db_utils.load_totals()
+    totals = df.pivot_table(index="Bank Name", columns="Transaction Type", values="Amount", aggfunc="sum")
+    return totals.reindex(columns=["واریز", "برداشت"]).fillna(0)
+
+@profiled(db_utils.db_file)
+def search_transactions(bank_name=None, person=None, transaction_type=None,
+                        start_date=None, end_date=None, min_amount=None, max_amount=None, limit=1000):
+    """
+    جستجوی چندشرطی تراکنش‌ها؛ مقادیر خالی نادیده گرفته می‌شوند.
+    ارقام فارسی در نام شخص و تاریخ‌ها به لاتین تبدیل می‌شوند.
+    :return: دیتافریم تراکنش‌ها از جدیدترین تاریخ، حداکثر limit ردیف
+    """
+    def clean(value):
+        value = str(value or "").translate(LATIN_DIGITS).strip()
+        return value or None
+
+    return db_utils.search_transactions(
+        bank_name=bank_name or None, person=clean(person), transaction_type=transaction_type or None,
+        start_date=clean(start_date), end_date=clean(end_date),
+        min_amount=min_amount, max_amount=max_amount, limit=limit
+    )
+
+# ---------------------
+# 🏦 موتور موجودی بانک‌ها
+# ---------------------
+class BalanceEngine:
+    """
+    نگهداری موجودی بانک‌ها در یک دیکشنری نام بانک ← موجودی.
+    واریز، برداشت و خواندن موجودی O(1) هستند و فقط بانک‌های تغییرکرده ذخیره می‌شوند.
+    جمع کل موجودی‌ها همراه هر تغییر به‌روز می‌شود.
+    """
+
+    def __init__(self, df_banks):
+        self._balances = dict(zip(df_banks["Bank Name"], df_banks["Balance"].astype(float)))
+        self._total = sum(self._balances.values())
+        self._changed = set()
 
-def update_bank_balance(df_banks, bank_name, amount, operation):
+    def __contains__(self, bank_name):
+        return bank_name in self._balances
+
+    def __len__(self):
+        return len(self._balances)
+
+    def bank_names(self):
+        """لیست نام بانک‌ها به ترتیب ثبت"""
+        return list(self._balances)
+
+    def get_balance(self, bank_name):
+        """موجودی یک بانک یا None اگر بانک وجود نداشته باشد"""
+        return self._balances.get(bank_name)
+
+    def total_balance(self):
+        """جمع موجودی تمام بانک‌ها"""
+        return self._total
+
+    def add_bank(self, bank_name, balance):
+        """افزودن بانک جدید؛ False اگر بانک از قبل وجود داشته باشد"""
+        if bank_name in self._balances:
+            return False
+        self._balances[bank_name] = float(balance)
+        self._total += float(balance)
+        return True
+
+    @staticmethod
+    def _check_amount(amount):
+        """مبلغ واریز و برداشت باید مثبت باشد؛ مبلغ منفی جهت تراکنش را برعکس می‌کند"""
+        if not amount > 0:
+            raise ValueError("مبلغ باید بزرگتر از صفر باشد.")
+
+    def deposit(self, bank_name, amount):
+        """
+        واریز؛ موجودی جدید یا None اگر بانک وجود نداشته باشد
+        :raises ValueError: اگر مبلغ بزرگتر از صفر نباشد
+        """
+        self._check_amount(amount)
+        if bank_name not in self._balances:
+            return None
+        self._balances[bank_name] += amount
+        self._total += amount
+        self._changed.add(bank_name)
+        return self._balances[bank_name]
+
+    def withdraw(self, bank_name, amount):
+        """
+        برداشت؛ موجودی جدید یا None اگر بانک وجود نداشته باشد یا موجودی کافی نباشد
+        :raises ValueError: اگر مبلغ بزرگتر از صفر نباشد
+        """
+        self._check_amount(amount)
+        balance = self._balances.get(bank_name)
+        if balance is None or balance - amount < 0:
+            return None
+        self._balances[bank_name] = balance - amount
+        self._total -= amount
+        self._changed.add(bank_name)
+        return self._balances[bank_name]
+
+    def post(self, bank_name, transaction_type, amount, reverse=False):
+        """
+        اعمال یک تراکنش روی موجودی
+        :param reverse: اگر True باشد اثر تراکنش برگردانده می‌شود (برای حذف تراکنش)
+        :return: موجودی جدید یا None در صورت خطا
+        """
+        if transaction_type not in ("واریز", "برداشت"):
+            return None
+        if (transaction_type == "واریز") != reverse:
+            return self.deposit(bank_name, amount)
+        return self.withdraw(bank_name, amount)
+
+    def apply_transactions(self, df, reverse=False):
+        """
+        اعمال گروهی تراکنش‌ها به صورت همه یا هیچ.
+        موجودی هر بانک به ترتیب ردیف‌ها بررسی می‌شود تا در هیچ لحظه منفی نشود.
+        :param df: دیتافریم با ستون‌های Bank Name، Transaction Type و Amount
+        :param reverse: اگر True باشد اثر تراکنش‌ها برگردانده می‌شود
+        :return: لیست ایندکس ردیف‌های مشکل‌دار؛ لیست خالی یعنی همه تراکنش‌ها اعمال شدند
+        """
+        if df.empty:
+            return []
+
+        amounts = df["Amount"].astype(float)
+        signed = amounts.where(df["Transaction Type"] == "واریز", -amounts)
+        signed = signed.where(df["Transaction Type"].isin(["واریز", "برداشت"]))
+        if reverse:
+            signed = -signed
+
+        opening = df["Bank Name"].map(self._balances)
+        running = opening + signed.groupby(df["Bank Name"]).cumsum()
+
+        # بانک نامعتبر، نوع نامعتبر یا موجودی منفی
+        invalid = opening.isna() | signed.isna() | (running < 0)
+        if invalid.any():
+            return df.index[invalid].tolist()
+
+        for bank_name, delta in signed.groupby(df["Bank Name"]).sum().items():
+            self._balances[bank_name] += delta
+            self._total += delta
+            self._changed.add(bank_name)
+        return []
+
+    @contextmanager
+    def rollback_on_error(self):
+        """
+        اگر در این بلوک خطایی رخ دهد (مثلاً ثبت در پایگاه داده شکست بخورد)، موجودی‌ها
+        به حالت قبل برمی‌گردند تا با پایگاه داده که تغییراتش برگردانده شده یکی بمانند
+        """
+        state = dict(self._balances), self._total, set(self._changed)
+        try:
+            yield
+        except BaseException:
+            self._balances, self._total, self._changed = state
+            raise
+
+    def to_frame(self):
+        """دیتافریم بانک‌ها با ستون‌های Bank Name و Balance"""
+        return pd.DataFrame(list(self._balances.items()), columns=["Bank Name", "Balance"])
+
+    def save(self, conn):
+        """ذخیره موجودی بانک‌های تغییرکرده در پایگاه داده"""
+        for bank_name in self._changed:
+            db_utils.set_balance(conn, bank_name, self._balances[bank_name])
+        self._changed.clear()
+
+
+@profiled(db_utils.db_file)
+def load_balances():
+    """ساخت موتور موجودی از لیست بانک‌ها"""
+    return BalanceEngine(db_utils.load_banks())
+
+@profiled(db_utils.db_file)
+def add_bank(balances, bank_name, initial_amount):
+    """
+    ایجاد حساب بانکی جدید
+    :return: True در صورت موفقیت، False اگر بانک تکراری باشد
     """
-    به‌روزرسانی موجودی بانک.
+    if not balances.add_bank(bank_name, initial_amount):
+        return False
+    with db_utils.get_connection() as conn:
+        db_utils.insert_bank(conn, bank_name, initial_amount)
+    return True
+
+@profiled(db_utils.db_file)
+def add_transaction(balances, bank_name, transaction_type, amount, date, purpose, person, receipt):
+    """
+    ثبت تراکنش جدید و به‌روزرسانی موجودی بانک در یک تراکنش پایگاه داده
+    :param balances: موتور موجودی (BalanceEngine)
+    :return: شناسه تراکنش یا None اگر بانک نامعتبر بود یا موجودی کافی نبود
+    """
+    with db_utils.get_connection() as conn, balances.rollback_on_error():
+        if balances.post(bank_name, transaction_type, amount) is None:
+            return None
+        balances.save(conn)
+        return db_utils.insert_transaction(
+            conn, bank_name, transaction_type, amount, date, purpose, person, receipt
+        )
+
+
+@profiled(db_utils.db_file)
+def update_bank_balance(df_banks, bank_name, amount, operation, conn=None):
+    """
+    به‌روزرسانی موجودی بانک در دیتافریم بانک‌ها.
+    برای چند عملیات پشت سر هم از BalanceEngine استفاده کنید.
     :param df_banks: دیتافریم بانک‌ها
     :param bank_name: نام بانک
     :param amount: مبلغ
     :param operation: "add" یا "subtract"
+    :param conn: اتصال باز پایگاه داده؛ اگر None باشد اتصال جدید ساخته می‌شود
     :return: df_banks به‌روزشده یا None اگر خطا بود
     """
-    if bank_name not in df_banks["Bank Name"].values:
+    mask = df_banks["Bank Name"] == bank_name
+    if not mask.any():
         return None
 
-    current_balance = df_banks.loc[df_banks["Bank Name"] == bank_name, "Balance"].values[0]
-
+    balances = BalanceEngine(df_banks[mask])
     if operation == "add":
-        new_balance = current_balance + amount
+        new_balance = balances.deposit(bank_name, amount)
     elif operation == "subtract":
-        new_balance = current_balance - amount
+        new_balance = balances.withdraw(bank_name, amount)
     else:
         return None
 
-    if new_balance < 0:
+    if new_balance is None:
         return None
 
-    df_banks.loc[df_banks["Bank Name"] == bank_name, "Balance"] = new_balance
+    # اصلاح دستی با تراکنش توضیح داده نمی‌شود؛ پس در موجودی اولیه هم ثبت می‌شود
+    delta = new_balance - float(df_banks.loc[mask, "Balance"].iloc[0])
+    if conn is None:
+        with db_utils.get_connection() as conn:
+            balances.save(conn)
+            db_utils.adjust_opening_balance(conn, bank_name, delta)
+    else:
+        balances.save(conn)
+        db_utils.adjust_opening_balance(conn, bank_name, delta)
+
+    df_banks.loc[mask, "Balance"] = new_balance
     return df_banks
 
-def delete_transaction(df_banks, df_transactions, index):
+def delete_transaction(balances, df_transactions, index):
     """
     حذف یک تراکنش و بروزرسانی موجودی بانک
-    :param df_banks: دیتافریم بانک‌ها
+    :param balances: موتور موجودی (BalanceEngine)
     :param df_transactions: دیتافریم تراکنش‌ها
-    :param index: ایندکس تراکنش مورد نظر برای حذف
-    :return: df_banks, df_transactions یا None در صورت خطا
+    :param index: شناسه (ایندکس) تراکنش مورد نظر برای حذف
+    :return: balances, df_transactions یا None در صورت خطا
+    """
+    return delete_transactions(balances, df_transactions, [index])
+
+@profiled(db_utils.db_file)
+def delete_transactions(balances, df_transactions, indexes):
+    """
+    حذف گروهی تراکنش‌ها و اصلاح موجودی بانک‌ها در یک مرحله
+    :param balances: موتور موجودی (BalanceEngine)
+    :param df_transactions: دیتافریم تراکنش‌ها
+    :param indexes: شناسه (ایندکس) تراکنش‌های مورد نظر برای حذف
+    :return: balances, df_transactions یا None اگر موجودی یکی از بانک‌ها منفی شود
     """
     try:
-        row = df_transactions.loc[index]
-        bank = row["Bank Name"]
-        amount = float(row["Amount"])
-        trans_type = row["Transaction Type"]
-
-        # اگر تراکنش از نوع واریز است، باید مبلغ از موجودی کم شود و بالعکس
-        if trans_type == "واریز":
-            df_banks = update_bank_balance(df_banks, bank, amount, "subtract")
-        elif trans_type == "برداشت":
-            df_banks = update_bank_balance(df_banks, bank, amount, "add")
-        else:
-            return None, None
-
-        # حذف تراکنش
-        df_transactions = df_transactions.drop(index).reset_index(drop=True)
-
-        return df_banks, df_transactions
+        rows = df_transactions.loc[list(indexes)]
+        # برگرداندن برداشت‌ها موجودی را زیاد می‌کند؛ اول اعمال می‌شوند تا فقط مانده نهایی بررسی شود
+        rows = rows.sort_values("Transaction Type", key=lambda s: s != "برداشت", kind="stable")
+
+        with db_utils.get_connection() as conn, balances.rollback_on_error():
+            if balances.apply_transactions(rows, reverse=True):
+                return None, None
+            balances.save(conn)
+            db_utils.delete_transaction_rows(conn, rows.index)
+
+        return balances, df_transactions.drop(rows.index)
     except Exception as e:
-        print("Error in delete_transaction:", e)
+        print("Error in delete_transactions:", e)
         return None, None
     
     
     
+
+
+# ---------------------
+# ⚖️ تطبیق موجودی‌ها با تاریخچه تراکنش‌ها
+# ---------------------
+# موجودی مورد انتظار هر بانک = موجودی اولیه + جمع واریزها - جمع برداشت‌ها.
+# جمع‌ها با یک پیمایش گروهی از خود جدول تراکنش‌ها محاسبه می‌شوند، نه از موجودی‌های ذخیره‌شده.
+DRIFT_TOLERANCE = 0.005
+
+@profiled(db_utils.db_file)
+def reconcile_balances():
+    """
+    مقایسه موجودی ثبت‌شده هر بانک با موجودی محاسبه‌شده از تراکنش‌ها
+    :return: دیتافریم با ایندکس نام بانک و ستون‌های Balance، Opening Balance، Deposits،
+             Withdrawals، Transactions، Expected و Drift (ثبت‌شده منهای مورد انتظار).
+             تراکنش‌های بانک‌های ناموجود با Balance خالی گزارش می‌شوند.
+    """
+    banks = db_utils.load_opening_balances().set_index("Bank Name")
+    sums = db_utils.load_history_sums()
+
+    totals = sums.pivot_table(index="Bank Name", columns="Transaction Type", values="Amount", aggfunc="sum")
+    totals = totals.reindex(columns=["واریز", "برداشت"]).fillna(0)
+
+    df = banks.join(totals, how="outer")
+    df["Deposits"] = df["واریز"].fillna(0)
+    df["Withdrawals"] = df["برداشت"].fillna(0)
+    df["Transactions"] = sums.groupby("Bank Name")["Count"].sum().reindex(df.index).fillna(0).astype(int)
+    df["Expected"] = df["Opening Balance"].fillna(0) + df["Deposits"] - df["Withdrawals"]
+    df["Drift"] = df["Balance"] - df["Expected"]
+    return df[["Balance", "Opening Balance", "Deposits", "Withdrawals", "Transactions", "Expected", "Drift"]]
+
+@profiled(db_utils.db_file)
+def rebuild_balances(bank_names=None):
+    """
+    اصلاح موجودی بانک‌هایی که با تاریخچه تراکنش‌ها مغایرت دارند
+    :param bank_names: فقط این بانک‌ها (None یعنی همه بانک‌های دارای مغایرت)
+    :return: تعداد بانک‌های اصلاح‌شده
+    """
+    df = reconcile_balances()
+    drifted = df[df["Balance"].notna() & (df["Drift"].abs() > DRIFT_TOLERANCE)]
+    if bank_names is not None:
+        drifted = drifted[drifted.index.isin(bank_names)]
+    with db_utils.get_connection() as conn:
+        for bank_name, expected in drifted["Expected"].items():
+            db_utils.set_balance(conn, bank_name, expected)
+    return len(drifted)
+
+
+# ---------------------
+# 📥 ورود گروهی تراکنش‌ها از صورتحساب بانک
+# ---------------------
+# ستون‌های فایل ورودی می‌توانند انگلیسی (مثل جدول تراکنش‌ها) یا فارسی باشند
+IMPORT_COLUMN_NAMES = {
+    "نام بانک": "Bank Name",
+    "بانک": "Bank Name",
+    "نوع تراکنش": "Transaction Type",
+    "نوع": "Transaction Type",
+    "مبلغ": "Amount",
+    "تاریخ": "Date",
+    "علت": "Purpose",
+    "شخص": "Person",
+    "شخص/شرکت": "Person",
+    "رسید": "Receipt",
+}
+
+def read_statement(uploaded_file):
+    """
+    خواندن فایل CSV یا اکسل صورتحساب؛ همه مقادیر به صورت متن خوانده می‌شوند
+    :return: دیتافریم با نام ستون‌های جدول تراکنش‌ها
+    """
+    if uploaded_file.name.lower().endswith(".csv"):
+        df = pd.read_csv(uploaded_file, dtype=str, keep_default_na=False)
+    else:
+        df = pd.read_excel(uploaded_file, dtype=str, keep_default_na=False)
+    df.columns = [IMPORT_COLUMN_NAMES.get(str(c).strip(), str(c).strip()) for c in df.columns]
+    # شماره ردیف‌ها مثل فایل اکسل (سطر اول عنوان ستون‌هاست)
+    df.index = df.index + 2
+    return df
+
+def validate_transactions(balances, df):
+    """
+    بررسی برداری ردیف‌های ورودی: ستون‌ها، مبلغ، نوع تراکنش، نام بانک و تاریخ شمسی
+    :return: (دیتافریم تراکنش‌های نرمال‌شده, دیتافریم خطاها با ستون‌های ردیف و خطا)
+    """
+    missing = [c for c in ["Bank Name", "Transaction Type", "Amount", "Date"] if c not in df.columns]
+    if missing:
+        return None, pd.DataFrame({"ردیف": ["-"], "خطا": [f"ستون‌های {', '.join(missing)} وجود ندارند"]})
+
+    df = df.reindex(columns=db_utils.TRANSACTION_COLUMNS).fillna("")
+    text = {c: df[c].astype(str).str.strip() for c in df.columns}
+    amounts = pd.to_numeric(
+        text["Amount"].str.translate(LATIN_DIGITS).str.replace(",", "", regex=False),
+        errors="coerce"
+    )
+    # تاریخ‌ها با صفرهای پیشرو ذخیره می‌شوند تا در نمای ماهانه، بازه تاریخ و جستجو پیدا شوند
+    dates = normalize_jalali_series(text["Date"].str.translate(LATIN_DIGITS).str.replace("-", "/", regex=False))
+    df = pd.DataFrame({
+        "Bank Name": text["Bank Name"],
+        "Transaction Type": text["Transaction Type"],
+        "Amount": amounts,
+        "Date": dates,
+        "Purpose": text["Purpose"],
+        "Person": text["Person"],
+        "Receipt": text["Receipt"],
+    }, index=df.index)
+
+    checks = [
+        (~(amounts > 0), "مبلغ نامعتبر است"),
+        (~df["Transaction Type"].isin(["واریز", "برداشت"]), "نوع تراکنش باید واریز یا برداشت باشد"),
+        (~df["Bank Name"].isin(balances.bank_names()), "بانک وجود ندارد"),
+        (dates.isna(), "تاریخ شمسی نامعتبر است"),
+    ]
+    errors = pd.concat([
+        pd.DataFrame({"ردیف": df.index[mask], "خطا": message}) for mask, message in checks if mask.any()
+    ] or [pd.DataFrame(columns=["ردیف", "خطا"])], ignore_index=True)
+    return df, errors.sort_values("ردیف", kind="stable", ignore_index=True)
+
+@profiled(db_utils.db_file)
+def import_transactions(balances, df):
+    """
+    ثبت گروهی تراکنش‌ها به صورت همه یا هیچ.
+    موجودی‌ها در یک مرحله با BalanceEngine.apply_transactions به‌روز می‌شوند
+    و همه ردیف‌ها در یک تراکنش پایگاه داده ذخیره می‌شوند.
+    :param balances: موتور موجودی (BalanceEngine)
+    :param df: دیتافریم خوانده شده با read_statement
+    :return: (تعداد تراکنش‌های ثبت شده, دیتافریم خطاها)؛ در صورت خطا هیچ تراکنشی ثبت نمی‌شود
+    """
+    df, errors = validate_transactions(balances, df)
+    if not errors.empty:
+        return 0, errors
+
+    with db_utils.get_connection() as conn, balances.rollback_on_error():
+        overdrafts = balances.apply_transactions(df)
+        if overdrafts:
+            return 0, pd.DataFrame({"ردیف": overdrafts, "خطا": "موجودی کافی نیست"})
+        balances.save(conn)
+        db_utils.insert_transactions(conn, df)
+    return len(df), errors
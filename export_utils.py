@@ -0,0 +1,150 @@
+import csv
+import io
+import os
+import tempfile
+
+import jdatetime
+import streamlit as st
+
+from date_utils import convert_to_gregorian, convert_series_to_jalali, gregorian_keys
+from format_utils import LATIN_DIGITS
+from store_utils import due_positions
+
+# ---------------------
+# 📥 خروجی اکسل/CSV لیست‌ها
+# ---------------------
+# ردیف‌ها تکه‌تکه از مولد خوانده و مستقیم در فایل نوشته می‌شوند؛ کارپوشه اکسل در
+# حالت write_only ساخته می‌شود و ردیف‌ها را در حافظه نگه نمی‌دارد. پس حافظه مصرفی
+# به اندازه یک تکه است و نه کل جدول. فایل فقط وقتی ساخته می‌شود که کاربر دکمه
+# دانلود را بزند.
+EXPORT_CHUNK_ROWS = 10000
+
+XLSX_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+# هر برگه اکسل حداکثر 1,048,576 ردیف دارد؛ ردیف‌های بیشتر در برگه بعدی نوشته می‌شوند
+XLSX_SHEET_ROWS = 1048576 - 1
+
+
+def _rows(chunk):
+    """ردیف‌های یک تکه به صورت تاپل؛ مقادیر خالی None می‌شوند"""
+    values = chunk.astype(object)
+    return values.where(values.notna(), None).itertuples(index=False, name=None)
+
+
+def write_xlsx(file, columns, chunks):
+    """نوشتن ردیف‌ها در یک کارپوشه اکسل write_only (در صورت نیاز در چند برگه)"""
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    headers = list(columns.values())
+    sheet = workbook.create_sheet()
+    sheet.append(headers)
+    sheet_rows = 0
+    for chunk in chunks:
+        for row in _rows(chunk[list(columns)]):
+            if sheet_rows == XLSX_SHEET_ROWS:
+                sheet = workbook.create_sheet()
+                sheet.append(headers)
+                sheet_rows = 0
+            sheet.append(row)
+            sheet_rows += 1
+    workbook.save(file)
+
+
+def write_csv(file, columns, chunks):
+    """نوشتن ردیف‌ها در فایل CSV (UTF-8 با BOM تا اکسل متن فارسی را درست باز کند)"""
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    csv.writer(text).writerow(columns.values())
+    for chunk in chunks:
+        chunk[list(columns)].to_csv(text, header=False, index=False)
+    text.flush()
+    text.detach()
+
+
+# قالب ← (پسوند فایل، نوع MIME، تابع نوشتن)
+FORMATS = {
+    "Excel": ("xlsx", XLSX_MIME, write_xlsx),
+    "CSV": ("csv", "text/csv", write_csv),
+}
+
+
+def export_file(columns, chunks, file_format="Excel"):
+    """
+    ساخت فایل خروجی روی دیسک و برگرداندن همان فایل، باز و فقط خواندنی.
+    محتوا در این‌جا یک‌جا خوانده نمی‌شود؛ فایل موقت با بسته شدن آن حذف می‌شود.
+    :param columns: دیکشنری نام ستون ← عنوان ستون در فایل
+    :param chunks: مولد دیتافریم‌ها
+    :return: فایل باینری (io.BufferedReader) از ابتدای فایل
+    """
+    _, _, write = FORMATS[file_format]
+    with tempfile.TemporaryFile() as file:
+        write(file, columns, chunks)
+        file.flush()
+        # download_button فایل‌های باینری را فقط از نوع BufferedReader می‌پذیرد
+        reader = open(os.dup(file.fileno()), "rb")
+    reader.seek(0)
+    return reader
+
+
+def due_date_chunks(path, columns, loader, start_date=None, end_date=None, fixups=None):
+    """
+    ردیف‌های یک بازه تاریخ سررسید به ترتیب تاریخ، تکه‌تکه و با تاریخ سررسید شمسی (برای خروجی)
+    :param start_date: تاریخ شمسی YYYY/MM/DD (None یعنی از ابتدا)
+    :param end_date: تاریخ شمسی YYYY/MM/DD (None یعنی تا انتها)
+    :param fixups: دیکشنری نام ستون ← تابع تبدیل سری، برای ستون‌های دیگری که باید تبدیل شوند
+    """
+    start_date, end_date = (None if d is None else convert_to_gregorian(d) for d in (start_date, end_date))
+    positions = due_positions(path, columns, start_date, end_date)
+    df = loader()
+    for start in range(0, len(positions), EXPORT_CHUNK_ROWS):
+        chunk = df.iloc[positions[start:start + EXPORT_CHUNK_ROWS]].copy()
+        chunk["Due Date"] = convert_series_to_jalali(gregorian_keys(chunk["Due Date"]))
+        for column, fixup in (fixups or {}).items():
+            chunk[column] = fixup(chunk[column])
+        yield chunk
+
+
+def parse_jalali_date(value):
+    """
+    تبدیل تاریخ شمسی واردشده به شکل استاندارد YYYY/MM/DD (با ارقام فارسی یا لاتین)
+    :return: تاریخ یا None اگر خالی باشد
+    :raises ValueError: اگر تاریخ معتبر نباشد
+    """
+    value = str(value or "").translate(LATIN_DIGITS).strip()
+    if not value:
+        return None
+    return jdatetime.datetime.strptime(value, "%Y/%m/%d").strftime("%Y/%m/%d")
+
+
+def export_widget(name, columns, chunks, key):
+    """
+    فرم خروجی یک لیست: بازه تاریخ شمسی اختیاری، قالب فایل و دکمه دانلود
+    :param name: نام فایل بدون پسوند
+    :param columns: دیکشنری نام ستون ← عنوان ستون در فایل
+    :param chunks: تابع (تاریخ شروع شمسی، تاریخ پایان شمسی) ← مولد دیتافریم‌ها
+    :param key: پیشوند کلید ویجت‌ها
+    """
+    with st.expander("📥 خروجی اکسل / CSV"):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            start_date = st.text_input("از تاریخ (YYYY/MM/DD)", key=f"{key}_export_start")
+        with col2:
+            end_date = st.text_input("تا تاریخ (YYYY/MM/DD)", key=f"{key}_export_end")
+        with col3:
+            file_format = st.radio("قالب", list(FORMATS), horizontal=True, key=f"{key}_export_format")
+
+        try:
+            start_date, end_date = parse_jalali_date(start_date), parse_jalali_date(end_date)
+        except ValueError:
+            st.error("تاریخ باید به شکل YYYY/MM/DD و معتبر باشد.")
+            return
+
+        extension, mime, _ = FORMATS[file_format]
+        suffix = "".join(f"_{d.replace('/', '-')}" for d in (start_date, end_date) if d)
+        st.download_button(
+            "دانلود فایل",
+            data=lambda: export_file(columns, chunks(start_date, end_date), file_format),
+            file_name=f"{name}{suffix}.{extension}",
+            mime=mime,
+            on_click="ignore",
+            key=f"{key}_export_download",
+        )
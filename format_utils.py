@@ -0,0 +1,39 @@
+import pandas as pd
+
+# ---------------------
+# 💰 فرمت و تبدیل مبالغ
+# ---------------------
+PERSIAN_DIGITS = str.maketrans("0123456789", "۰۱۲۳۴۵۶۷۸۹")
+LATIN_DIGITS = str.maketrans("۰۱۲۳۴۵۶۷۸۹٠١٢٣٤٥٦٧٨٩", "01234567890123456789")
+
+def format_currency(amount):
+    """فرمت کردن مبلغ با کاما برای نمایش"""
+    try:
+        return "{:,.0f}".format(float(amount))
+    except:
+        return amount
+
+def parse_currency(amount_str):
+    """تبدیل مبلغ فرمت شده به عدد برای ذخیره"""
+    try:
+        return float(str(amount_str).translate(LATIN_DIGITS).replace(",", "").strip())
+    except:
+        return 0.0
+
+def format_currency_series(series, persian_digits=False):
+    """
+    فرمت یک ستون مبلغ با جداکننده هزارگان.
+    تبدیل به عدد یک‌باره برای کل ستون انجام می‌شود و فقط مقادیر عددی فرمت می‌شوند.
+    مقادیر خالی به رشته خالی و مقادیر غیرعددی بدون تغییر برگردانده می‌شوند.
+    :param persian_digits: نمایش با ارقام فارسی
+    """
+    series = pd.Series(series)
+    numeric = pd.to_numeric(series, errors="coerce").to_numpy(dtype=float, na_value=float("nan"))
+    valid = ~pd.isna(numeric)
+
+    result = series.astype(object).to_numpy(copy=True)
+    result[series.isna().to_numpy()] = ""
+    result[valid] = [f"{value:,.0f}" for value in numeric[valid]]
+    if persian_digits:
+        result[valid] = [value.translate(PERSIAN_DIGITS) for value in result[valid]]
+    return pd.Series(result, index=series.index, dtype=object)
@@ -0,0 +1,119 @@
+import hashlib
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import streamlit as st
+
+# ---------------------
+# 🖼️ ذخیره تصاویر بر اساس محتوا
+# ---------------------
+# نام هر فایل هش SHA-256 محتوای آن است؛ پس تصویر تکراری فقط یک بار ذخیره می‌شود.
+# تصویر کوچک (thumbnail) هر فایل در پس‌زمینه ساخته می‌شود و لیست‌ها آن را نمایش می‌دهند.
+THUMBNAILS_DIR = "thumbs"
+THUMBNAIL_SIZE = (320, 320)
+THUMBNAIL_QUALITY = 70
+
+# فایل آپلود شده تکه به تکه نوشته می‌شود تا مصرف حافظه به اندازه فایل بستگی نداشته باشد
+CHUNK_SIZE = 1024 * 1024
+MAX_IMAGE_BYTES = 20 * 1024 * 1024
+
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="thumbnail")
+
+# مسیر تصویر ← مسیر نمایش (تصویر کوچک یا خود تصویر)؛ وجود هر تصویر کوچک فقط یک بار
+# روی دیسک بررسی می‌شود و پس از ساخت در پس‌زمینه همین‌جا به‌روز می‌شود
+_display_paths = {}
+
+
+def thumbnail_path(path):
+    """مسیر تصویر کوچک متناظر با یک تصویر"""
+    directory, filename = os.path.split(path)
+    return os.path.join(directory, THUMBNAILS_DIR, os.path.splitext(filename)[0] + ".jpg")
+
+
+def _make_thumbnail(path):
+    """ساخت تصویر کوچک فشرده؛ PIL فقط در همین‌جا بارگذاری می‌شود"""
+    from PIL import Image
+
+    thumb = thumbnail_path(path)
+    if os.path.exists(thumb):
+        _display_paths[path] = thumb
+        return thumb
+    try:
+        os.makedirs(os.path.dirname(thumb), exist_ok=True)
+        with Image.open(path) as image:
+            image.thumbnail(THUMBNAIL_SIZE)
+            tmp_thumb = thumb + ".tmp"
+            image.convert("RGB").save(tmp_thumb, "JPEG", quality=THUMBNAIL_QUALITY, optimize=True)
+        os.replace(tmp_thumb, thumb)
+        _display_paths[path] = thumb
+        return thumb
+    except Exception as e:
+        print("Error in _make_thumbnail:", e)
+        return None
+
+
+def save_image(uploaded_file, directory):
+    """
+    ذخیره تصویر آپلود شده با نام هش محتوا و زمان‌بندی ساخت تصویر کوچک
+    :param uploaded_file: فایل آپلود شده Streamlit
+    :param directory: دایرکتوری مقصد
+    :return: مسیر فایل ذخیره شده یا None در صورت خطا
+    """
+    tmp_path = None
+    try:
+        os.makedirs(directory, exist_ok=True)
+        ext = os.path.splitext(uploaded_file.name)[1].lower()
+
+        # نوشتن تکه به تکه در فایل موقت و محاسبه هم‌زمان هش و اندازه
+        digest = hashlib.sha256()
+        size = 0
+        uploaded_file.seek(0)
+        with tempfile.NamedTemporaryFile("wb", dir=directory, suffix=".tmp", delete=False) as f:
+            tmp_path = f.name
+            while True:
+                chunk = uploaded_file.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > MAX_IMAGE_BYTES:
+                    st.error(f"حجم تصویر بیشتر از {MAX_IMAGE_BYTES // (1024 * 1024)} مگابایت است.")
+                    return None
+                digest.update(chunk)
+                f.write(chunk)
+            f.flush()
+            os.fsync(f.fileno())
+
+        # فایل تکراری دوباره ذخیره نمی‌شود
+        file_path = os.path.join(directory, digest.hexdigest() + ext)
+        if os.path.exists(file_path):
+            os.remove(tmp_path)
+        else:
+            os.replace(tmp_path, file_path)
+        tmp_path = None
+
+        _executor.submit(_make_thumbnail, file_path)
+        return file_path
+    except Exception as e:
+        st.error(f"خطا در ذخیره تصویر: {str(e)}")
+        return None
+    finally:
+        if tmp_path is not None and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def thumbnail_series(series):
+    """
+    مسیر تصویر کوچک برای یک ستون مسیر تصاویر.
+    اگر تصویر کوچک هنوز ساخته نشده باشد مسیر اصلی برگردانده می‌شود.
+    """
+    def pick(path):
+        if not isinstance(path, str) or not path:
+            return path
+        if path not in _display_paths:
+            thumb = thumbnail_path(path)
+            _display_paths[path] = thumb if os.path.exists(thumb) else path
+        return _display_paths[path]
+
+    return pd.Series(series).map(pick)
@@ -1,9 +1,13 @@
 import streamlit as st
 import pandas as pd
 from datetime import datetime
-import os
-import jdatetime
 import uuid
+from store_utils import load_table, save_table, append_record, load_derived, delete_records, load_id_index
+from date_utils import convert_to_jalali
+from format_utils import parse_currency, format_currency_series
+from ui_utils import paginate
+from profiling_utils import profiled
+from export_utils import EXPORT_CHUNK_ROWS, export_widget
 
 # تنظیمات اولیه
 
@@ -11,64 +15,41 @@ import uuid
 # نام فایل‌ها
 phone_numbers_file = "phone_numbers.xlsx"
 partners_file = "partners.xlsx"
-def format_currency(amount):
-    """فرمت کردن مبلغ با کاما برای نمایش"""
-    try:
-        return "{:,.0f}".format(float(amount))
-    except:
-        return amount
-
-def parse_currency(amount_str):
-    """تبدیل مبلغ فرمت شده به عدد برای ذخیره"""
-    try:
-        return float(str(amount_str).replace(",", "").strip())
-    except:
-        return 0.0
-
-def convert_to_jalali(gregorian_date):
-    """تبدیل تاریخ میلادی به شمسی"""
-    try:
-        if isinstance(gregorian_date, str):
-            gregorian_date = datetime.strptime(gregorian_date, "%Y/%m/%d")
-        jalali_date = jdatetime.date.fromgregorian(date=gregorian_date)
-        return jalali_date.strftime("%Y/%m/%d")
-    except:
-        return gregorian_date
+phone_numbers_columns = [
+    "ID", "Phone Number", "Price", "Description",
+    "Register Date", "Status", "Partner ID"
+]
+partners_columns = ["ID", "Name", "Phone", "Address", "Register Date"]
 # ---------------------
 # 📌 توابع مدیریت شماره‌های تلفن
 # ---------------------
+@profiled(phone_numbers_file)
 def load_phone_numbers():
     """بارگذاری لیست شماره‌های تلفن"""
-    if os.path.exists(phone_numbers_file):
-        df = pd.read_excel(phone_numbers_file)
-    else:
-        df = pd.DataFrame(columns=[
-            "ID", "Phone Number", "Price", "Description", 
-            "Register Date", "Status", "Partner ID"
-        ])
-    return df
+    return load_table(phone_numbers_file, phone_numbers_columns)
 
+@profiled(phone_numbers_file)
 def save_phone_numbers(df):
     """ذخیره لیست شماره‌های تلفن"""
-    df.to_excel(phone_numbers_file, index=False)
+    save_table(phone_numbers_file, df)
+    from search_utils import index_table
+    index_table("phones", df)
 
+@profiled(phone_numbers_file)
 def add_phone_number(number, price, description, partner_id=None):
     """افزودن شماره تلفن جدید"""
     try:
-        df = load_phone_numbers()
         new_id = str(uuid.uuid4())
         current_date = convert_to_jalali(datetime.now().strftime("%Y/%m/%d"))
         
-        new_record = pd.DataFrame([[
-            new_id, number, price, description,
-            current_date, "موجود", partner_id
-        ]], columns=[
-            "ID", "Phone Number", "Price", "Description",
-            "Register Date", "Status", "Partner ID"
-        ])
-        
-        df = pd.concat([df, new_record], ignore_index=True)
-        save_phone_numbers(df)
+        row = {
+            "ID": new_id, "Phone Number": number, "Price": price,
+            "Description": description, "Register Date": current_date,
+            "Status": "موجود", "Partner ID": partner_id
+        }
+        append_record(phone_numbers_file, row)
+        from search_utils import index_record
+        index_record("phones", row)
         return True
     except Exception as e:
         st.error(f"خطا در ثبت شماره: {str(e)}")
@@ -76,9 +57,14 @@ def add_phone_number(number, price, description, partner_id=None):
 
 def mark_as_sold(phone_id):
     """علامت‌گذاری شماره به عنوان فروخته شده"""
+    return mark_as_sold_many([phone_id])
+
+@profiled(phone_numbers_file)
+def mark_as_sold_many(phone_ids):
+    """علامت‌گذاری گروهی شماره‌ها به عنوان فروخته شده با یک بار خواندن و یک بار ذخیره"""
     try:
         df = load_phone_numbers()
-        df.loc[df["ID"] == phone_id, "Status"] = "فروخته شده"
+        df.loc[df["ID"].isin(phone_ids), "Status"] = "فروخته شده"
         save_phone_numbers(df)
         return True
     except Exception as e:
@@ -87,10 +73,22 @@ def mark_as_sold(phone_id):
 
 def delete_phone_number(phone_id):
     """حذف شماره تلفن"""
+    return delete_phone_numbers([phone_id])
+
+@profiled(phone_numbers_file)
+def delete_phone_numbers(phone_ids):
+    """
+    حذف گروهی شماره‌های تلفن با شناسه؛ فقط یک tombstone به ژورنال اضافه می‌شود
+    :return: True اگر شماره‌ای حذف شد (شناسه‌های ناموجود نادیده گرفته می‌شوند)
+    """
     try:
-        df = load_phone_numbers()
-        df = df[df["ID"] != phone_id]
-        save_phone_numbers(df)
+        ids = load_id_index(phone_numbers_file, phone_numbers_columns)
+        phone_ids = [str(i) for i in phone_ids if str(i) in ids]
+        if not phone_ids:
+            return False
+        delete_records(phone_numbers_file, phone_ids)
+        from search_utils import unindex_records
+        unindex_records("phones", phone_ids)
         return True
     except Exception as e:
         st.error(f"خطا در حذف شماره: {str(e)}")
@@ -99,43 +97,74 @@ def delete_phone_number(phone_id):
 # ---------------------
 # 📌 توابع مدیریت شرکا
 # ---------------------
+@profiled(partners_file)
 def load_partners():
     """بارگذاری لیست شرکا"""
-    if os.path.exists(partners_file):
-        df = pd.read_excel(partners_file)
-    else:
-        df = pd.DataFrame(columns=[
-            "ID", "Name", "Phone", "Address", "Register Date"
-        ])
-    return df
+    return load_table(partners_file, partners_columns)
 
+@profiled(partners_file)
+def load_partner_names():
+    """دیکشنری شناسه شریک ← نام؛ همراه با لیست شرکا کش می‌شود"""
+    return load_derived(partners_file, partners_columns, "names", lambda df: dict(zip(df["ID"], df["Name"])))
+
+@profiled(partners_file)
 def save_partners(df):
     """ذخیره لیست شرکا"""
-    df.to_excel(partners_file, index=False)
+    save_table(partners_file, df)
 
+@profiled(partners_file)
 def add_partner(name, phone, address):
     """افزودن شریک جدید"""
     try:
-        df = load_partners()
         new_id = str(uuid.uuid4())
         current_date = convert_to_jalali(datetime.now().strftime("%Y/%m/%d"))
         
-        new_record = pd.DataFrame([[
-            new_id, name, phone, address, current_date
-        ]], columns=[
-            "ID", "Name", "Phone", "Address", "Register Date"
-        ])
-        
-        df = pd.concat([df, new_record], ignore_index=True)
-        save_partners(df)
+        append_record(partners_file, {
+            "ID": new_id, "Name": name, "Phone": phone,
+            "Address": address, "Register Date": current_date
+        })
         return True, new_id
     except Exception as e:
         st.error(f"خطا در ثبت شریک: {str(e)}")
         return False, None
 
+# ستون‌های فایل خروجی شماره‌ها
+PHONE_EXPORT_COLUMNS = {
+    "Phone Number": "شماره", "Price": "قیمت", "Description": "توضیحات",
+    "Register Date": "تاریخ ثبت", "Status": "وضعیت", "Partner Name": "شریک",
+}
+
+def export_phone_numbers(start_date=None, end_date=None):
+    """
+    شماره‌های ثبت‌شده در یک بازه تاریخ ثبت شمسی، تکه‌تکه و با نام شریک (برای خروجی)
+    :param start_date: تاریخ شمسی YYYY/MM/DD (None یعنی از ابتدا)
+    :param end_date: تاریخ شمسی YYYY/MM/DD (None یعنی تا انتها)
+    """
+    df = load_phone_numbers()
+    partner_names = load_partner_names()
+    # تاریخ ثبت شمسی با صفرهای پیشرو ذخیره می‌شود، پس مقایسه رشته‌ای همان مقایسه تاریخ است
+    mask = pd.Series(True, index=df.index)
+    if start_date is not None:
+        mask &= df["Register Date"].astype(str) >= start_date
+    if end_date is not None:
+        mask &= df["Register Date"].astype(str) <= end_date
+    positions = mask.to_numpy().nonzero()[0]
+    for start in range(0, len(positions), EXPORT_CHUNK_ROWS):
+        chunk = df.iloc[positions[start:start + EXPORT_CHUNK_ROWS]].copy()
+        chunk["Partner Name"] = chunk["Partner ID"].map(partner_names)
+        yield chunk
+
 # ---------------------
 # 🖥️ رابط کاربری
 # ---------------------
+def phones_display_frame(df, partner_names):
+    """آماده‌سازی ردیف‌ها برای نمایش: قیمت فرمت‌شده و نام شریک"""
+    df = df.copy()
+    df["Price"] = format_currency_series(df["Price"])
+    df["Partner Name"] = df["Partner ID"].map(partner_names).fillna("-")
+    return df
+
+@profiled(phone_numbers_file, partners_file)
 def phone_numbers_management():
     """مدیریت شماره‌های تلفن"""
     st.header("مدیریت شماره‌های تلفن")
@@ -145,9 +174,7 @@ def phone_numbers_management():
     with tab1:
         st.subheader("ثبت شماره تلفن جدید")
         
-        partners_df = load_partners()
-        partners_list = partners_df["Name"].tolist()
-        partners_list.insert(0, "بدون شریک")
+        partner_names = load_partner_names()
         
         col1, col2 = st.columns(2)
         with col1:
@@ -155,7 +182,10 @@ def phone_numbers_management():
             price = st.text_input("قیمت (ریال)", value="0")
         with col2:
             description = st.text_input("توضیحات (اختیاری)")
-            partner_name = st.selectbox("شریک", partners_list)
+            partner_id = st.selectbox(
+                "شریک", [None] + list(partner_names),
+                format_func=lambda pid: "بدون شریک" if pid is None else partner_names[pid]
+            )
         
         if st.button("ثبت شماره"):
             if not phone_number:
@@ -163,10 +193,6 @@ def phone_numbers_management():
             elif not price or parse_currency(price) <= 0:
                 st.error("لطفاً قیمت معتبر وارد کنید.")
             else:
-                partner_id = None
-                if partner_name != "بدون شریک":
-                    partner_id = partners_df[partners_df["Name"] == partner_name]["ID"].values[0]
-                
                 if add_phone_number(phone_number, parse_currency(price), description, partner_id):
                     st.success("شماره تلفن با موفقیت ثبت شد.")
     
@@ -174,7 +200,7 @@ def phone_numbers_management():
         st.subheader("لیست شماره‌های تلفن")
         
         df = load_phone_numbers()
-        partners_df = load_partners()
+        partner_names = load_partner_names()
         
         if df.empty:
             st.info("هیچ شماره تلفنی ثبت نشده است.")
@@ -186,35 +212,57 @@ def phone_numbers_management():
             if display_df.empty:
                 st.info("هیچ شماره تلفنی موجود نیست.")
             else:
+                # فقط ردیف‌های صفحه جاری ساخته و فرمت می‌شوند
+                display_df = paginate(
+                    display_df, "phones",
+                    sort_columns={"شماره": "Phone Number", "قیمت": "Price", "تاریخ ثبت": "Register Date"},
+                    search_columns=["Phone Number", "Description"]
+                )
+                display_df = phones_display_frame(display_df, partner_names)
+                
                 # نمایش لیست
+                selected_ids = []
                 for _, row in display_df.iterrows():
-                    cols = st.columns([2, 2, 2, 3, 2, 2, 1, 1])
+                    cols = st.columns([1, 2, 2, 2, 3, 2, 2, 1, 1])
                     
                     with cols[0]:
-                        st.text(row["Phone Number"])
+                        if st.checkbox("انتخاب", key=f"select_{row['ID']}", label_visibility="collapsed"):
+                            selected_ids.append(row["ID"])
                     with cols[1]:
-                        st.text(format_currency(row["Price"]))
+                        st.text(row["Phone Number"])
                     with cols[2]:
-                        st.text(row["Description"] if pd.notna(row["Description"]) else "-")
+                        st.text(row["Price"])
                     with cols[3]:
-                        partner_name = "-"
-                        if pd.notna(row["Partner ID"]):
-                            partner = partners_df[partners_df["ID"] == row["Partner ID"]]
-                            if not partner.empty:
-                                partner_name = partner["Name"].values[0]
-                        st.text(partner_name)
+                        st.text(row["Description"] if pd.notna(row["Description"]) else "-")
                     with cols[4]:
-                        st.text(row["Register Date"])
+                        st.text(row["Partner Name"])
                     with cols[5]:
-                        st.text(row["Status"])
+                        st.text(row["Register Date"])
                     with cols[6]:
+                        st.text(row["Status"])
+                    with cols[7]:
                         if st.button("فروخته شد", key=f"sold_{row['ID']}"):
                             if mark_as_sold(row["ID"]):
                                 st.rerun()
-                    with cols[7]:
+                    with cols[8]:
                         if st.button("حذف", key=f"del_{row['ID']}"):
                             if delete_phone_number(row["ID"]):
                                 st.rerun()
+                
+                # عملیات گروهی روی شماره‌های انتخاب‌شده
+                if selected_ids:
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        if st.button(f"فروخته شد ({len(selected_ids)} شماره)", key="sold_selected"):
+                            if mark_as_sold_many(selected_ids):
+                                st.rerun()
+                    with col2:
+                        if st.button(f"حذف ({len(selected_ids)} شماره)", key="delete_selected"):
+                            if delete_phone_numbers(selected_ids):
+                                st.rerun()
+            
+            # خروجی همه شماره‌ها (موجود و فروخته شده)
+            export_widget("phone_numbers", PHONE_EXPORT_COLUMNS, export_phone_numbers, "phones")
     
     with tab3:
         st.subheader("ثبت شریک جدید")
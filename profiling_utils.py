@@ -0,0 +1,127 @@
+import json
+import os
+import threading
+import time
+import uuid
+from datetime import datetime
+from functools import wraps
+
+import pandas as pd
+
+# ---------------------
+# ⏱️ زمان‌بندی توابع خواندن و ذخیره (اختیاری)
+# ---------------------
+# فقط با متغیر محیطی APP_PROFILE=1 فعال می‌شود؛ در غیر این صورت دکوراتور
+# همان تابع اصلی را برمی‌گرداند و هیچ هزینه‌ای ندارد.
+# هر اندازه‌گیری یک خط JSON در فایل لاگ است و در پنل کناری همان اجرا نمایش داده می‌شود.
+ENABLED = os.environ.get("APP_PROFILE") == "1"
+LOG_FILE = os.environ.get("APP_PROFILE_LOG", "profile.jsonl")
+
+# اندازه‌گیری‌های اجرای جاری هر نخ اسکریپت Streamlit
+_state = threading.local()
+_log_lock = threading.Lock()
+
+
+def _count_rows(result):
+    """تعداد ردیف‌های خروجی: دیتافریم، چند دیتافریم یا دیکشنری"""
+    if isinstance(result, (pd.DataFrame, pd.Series, dict)):
+        return len(result)
+    if isinstance(result, tuple):
+        counts = [len(r) for r in result if isinstance(r, (pd.DataFrame, pd.Series))]
+        return sum(counts) if counts else None
+    return None
+
+
+def _file_sizes(files):
+    """اندازه فایل‌ها و ژورنال آن‌ها به بایت"""
+    sizes = {}
+    for path in files:
+        for f in (path, path + ".journal"):
+            if os.path.exists(f):
+                sizes[f] = os.path.getsize(f)
+    return sizes
+
+
+def _record(name, seconds, rows=None, files=()):
+    """ثبت یک اندازه‌گیری در اجرای جاری و در فایل لاگ"""
+    record = {
+        "time": datetime.now().isoformat(timespec="milliseconds"),
+        "rerun": getattr(_state, "rerun", None),
+        "name": name,
+        "depth": getattr(_state, "depth", 0),
+        "seconds": round(seconds, 6),
+        "rows": rows,
+        "files": _file_sizes(files),
+    }
+    getattr(_state, "records", []).append(record)
+    try:
+        with _log_lock, open(LOG_FILE, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    except Exception as e:
+        print("Error in profiling log:", e)
+
+
+def profiled(*files):
+    """
+    دکوراتور زمان‌بندی یک تابع
+    :param files: فایل‌هایی که تابع می‌خواند یا می‌نویسد (اندازه آن‌ها در لاگ ثبت می‌شود)
+    """
+    def decorator(func):
+        if not ENABLED:
+            return func
+        name = f"{func.__module__}.{func.__name__}"
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            depth = getattr(_state, "depth", 0)
+            _state.depth = depth + 1
+            start = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            finally:
+                seconds = time.perf_counter() - start
+                _state.depth = depth
+            _record(name, seconds, _count_rows(result), files)
+            return result
+        return wrapper
+    return decorator
+
+
+def start_rerun():
+    """شروع اندازه‌گیری یک اجرای اسکریپت؛ ابتدای app.py فراخوانی می‌شود"""
+    if not ENABLED:
+        return
+    _state.rerun = uuid.uuid4().hex[:8]
+    _state.records = []
+    _state.depth = 0
+    _state.started = time.perf_counter()
+
+
+def render_panel():
+    """نمایش جدول زمان‌بندی اجرای جاری در نوار کناری؛ انتهای app.py فراخوانی می‌شود"""
+    if not ENABLED or not hasattr(_state, "started"):
+        return
+    import streamlit as st
+
+    total = time.perf_counter() - _state.started
+    _record("rerun", total)
+    records = pd.DataFrame(_state.records[:-1], columns=["name", "depth", "seconds", "rows"])
+
+    with st.sidebar.expander("⏱️ زمان‌بندی این اجرا", expanded=False):
+        if records.empty:
+            st.caption("هیچ تابعی اندازه‌گیری نشد.")
+        else:
+            summary = records.groupby("name", sort=False).agg(
+                calls=("seconds", "size"), ms=("seconds", "sum"), rows=("rows", "max")
+            )
+            summary["ms"] = (summary["ms"] * 1000).round(1)
+            st.dataframe(summary.sort_values("ms", ascending=False), use_container_width=True)
+
+        # زمانی که در توابع اندازه‌گیری‌شده سطح اول نبوده، صرف ساخت ویجت‌ها و بقیه اسکریپت شده است
+        measured = records.loc[records["depth"] == 0, "seconds"].sum()
+        st.caption(
+            f"کل اجرا: {total * 1000:.1f} ms - "
+            f"توابع: {measured * 1000:.1f} ms - "
+            f"ویجت‌ها و سایر: {(total - measured) * 1000:.1f} ms"
+        )
+        st.caption(f"لاگ: {LOG_FILE} (اجرا {_state.rerun})")
@@ -0,0 +1,118 @@
+import pandas as pd
+
+import db_utils
+from store_utils import enqueue_write, flush
+from text_utils import normalize_text, match_query
+
+# ---------------------
+# 🔎 جستجوی متنی در همه منابع
+# ---------------------
+# متن رکوردها در جدول‌های ایندکس متنی پایگاه داده (db_utils) نگهداری می‌شود؛
+# پس زمان جستجو به اندازه جدول‌ها بستگی ندارد و فایل‌های اکسل خوانده نمی‌شوند.
+# متن تراکنش‌ها را خود db_utils ثبت می‌کند. برای بقیه منابع، ثبت یک رکورد
+# همان رکورد را به ایندکس اضافه می‌کند و ذخیره کامل در صف نوشتن پس‌زمینه
+# ایندکس آن منبع را با جدول جدید هماهنگ می‌کند.
+#
+# منبع ← (عنوان، ستون‌های قابل جستجو، ستون‌های نمایش، ستون شناسه)
+TEXT_SOURCES = {
+    "transactions": ("تراکنش", None, None, None),
+    "checks": (
+        "چک", ["Owner Name", "Account Owner", "Description"],
+        ["Check Number", "Owner Name", "Account Owner", "Description"], "ID"
+    ),
+    "debts": ("طلبکار/بدهکار", ["Name", "Description"], ["Type", "Name", "Description"], "ID"),
+    "phones": ("شماره تلفن", ["Description"], ["Phone Number", "Description"], "ID"),
+}
+
+
+def _queue_key(source):
+    """کلید صف نوشتن برای هماهنگ‌سازی ایندکس یک منبع"""
+    return f"{db_utils.db_file}#text:{source}"
+
+
+def _join(df, columns, separator):
+    """اتصال مقادیر غیرخالی چند ستون در هر ردیف"""
+    values = df.reindex(columns=columns).astype(object)
+    values = values.where(values.notna(), "").astype(str)
+    return [separator.join(v for v in row if v) for row in values.itertuples(index=False, name=None)]
+
+
+def text_records(source, df):
+    """
+    متن یکسان‌شده و متن نمایشی رکوردهای یک منبع
+    :return: دیتافریم با ایندکس کلید رکورد و ستون‌های Text و Display
+    """
+    _, text_columns, display_columns, key_column = TEXT_SOURCES[source]
+    keys = df[key_column].astype(str)
+    return pd.DataFrame({
+        "Text": [normalize_text(text) for text in _join(df, text_columns, " ")],
+        "Display": _join(df, display_columns, " - "),
+    }, index=pd.Index(keys))
+
+
+def index_table(source, df):
+    """هماهنگ‌سازی ایندکس یک منبع با کل جدول آن، در پس‌زمینه"""
+    enqueue_write(
+        _queue_key(source), df.reset_index(drop=True),
+        lambda path, data: db_utils.sync_text_records(source, text_records(source, data))
+    )
+
+
+def index_record(source, row):
+    """
+    افزودن یک رکورد تازه ثبت‌شده به ایندکس
+    :param row: دیکشنری ستون ← مقدار
+    """
+    # هماهنگ‌سازی در صف باید قبل از این رکورد اعمال شده باشد
+    flush(_queue_key(source))
+    db_utils.upsert_text_records(source, text_records(source, pd.DataFrame([row])))
+
+
+def unindex_records(source, keys):
+    """حذف رکوردهای حذف‌شده از ایندکس"""
+    flush(_queue_key(source))
+    db_utils.delete_text_records(source, keys)
+
+
+def ensure_indexed():
+    """ساخت ایندکس منابعی که هنوز ایندکس نشده‌اند (مثلاً داده‌های قبل از اضافه شدن ایندکس)"""
+    indexed = db_utils.load_text_sources()
+    if "checks" not in indexed:
+        from check_utils import load_checks_data
+        index_table("checks", load_checks_data())
+    if "debts" not in indexed:
+        from deb_utils import load_debts_data
+        index_table("debts", load_debts_data())
+    if "phones" not in indexed:
+        from lines_utils import load_phone_numbers
+        index_table("phones", load_phone_numbers())
+
+
+def rebuild_index():
+    """بازسازی کامل ایندکس همه منابع (مثلاً بعد از ویرایش دستی فایل‌های اکسل)"""
+    from check_utils import load_checks_data
+    from deb_utils import load_debts_data
+    from lines_utils import load_phone_numbers
+
+    with db_utils.get_connection() as conn:
+        db_utils.index_transactions(conn)
+    index_table("checks", load_checks_data())
+    index_table("debts", load_debts_data())
+    index_table("phones", load_phone_numbers())
+    for source in TEXT_SOURCES:
+        flush(_queue_key(source))
+
+
+def search(query, limit=200):
+    """
+    جستجوی متنی در همه منابع؛ همه کلمات عبارت باید (به صورت پیشوندی) در رکورد باشند
+    :return: دیتافریم با ستون‌های Source (عنوان منبع)، Key و Display
+    """
+    match = match_query(query)
+    if match is None:
+        return pd.DataFrame(columns=["Source", "Key", "Display"])
+    for source in TEXT_SOURCES:
+        flush(_queue_key(source))
+    df = db_utils.search_text(match, limit).copy()
+    df["Source"] = df["Source"].map(lambda source: TEXT_SOURCES.get(source, (source,))[0])
+    return df
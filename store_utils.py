@@ -0,0 +1,736 @@
+import atexit
+import bisect
+import glob
+import itertools
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict, defaultdict
+
+import numpy as np
+import pandas as pd
+
+# ---------------------
+# 🗃️ کش مشترک خواندن داده‌ها
+# ---------------------
+# Streamlit در هر تعامل کاربر کل اسکریپت را دوباره اجرا می‌کند، ولی ماژول‌ها
+# در sys.modules باقی می‌مانند؛ پس این دیکشنری بین اجراها حفظ می‌شود.
+# کلید: (مسیر فایل، نام جدول) ← مقدار: (امضای فایل، دیتافریم)
+_cache = {}
+
+# نتیجه پرس‌وجوهایی که کلیدشان به ورودی کاربر بستگی دارد (جستجو، بازه تاریخ) فقط
+# در یک کش LRU محدود نگهداری می‌شود تا حافظه با تعداد جستجوهای متفاوت رشد نکند
+QUERY_CACHE_ENTRIES = 32
+_query_cache = OrderedDict()
+_query_lock = threading.Lock()
+
+# کپی سطحی فقط با Copy-on-Write امن است (در pandas 3 همیشه فعال است)
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+
+
+def file_signature(path):
+    """امضای فایل بر اساس زمان آخرین تغییر و اندازه؛ None اگر فایل وجود نداشته باشد"""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def cached_read(path, loader, name="", signature=None):
+    """
+    خواندن داده با کش.
+    تا زمانی که امضای فایل تغییر نکرده، همان دیتافریم قبلی برگردانده می‌شود.
+    :param path: مسیر فایلی که داده از آن خوانده می‌شود
+    :param loader: تابع بدون ورودی که دیتافریم را از فایل می‌خواند
+    :param name: نام جدول، برای وقتی که یک فایل چند جدول دارد
+    :param signature: امضای دلخواه به جای امضای فایل path (مثلاً وقتی داده از چند فایل می‌آید)
+    :return: کپی سطحی از دیتافریم کش‌شده؛ تغییر آن روی کش اثری ندارد
+    """
+    if signature is None:
+        signature = file_signature(path)
+    return _cached((path, name), signature, loader).copy(deep=False)
+
+
+def _cached(key, signature, loader):
+    """مقدار کش‌شده برای یک کلید، یا اجرای loader اگر امضا تغییر کرده باشد"""
+    entry = _cache.get(key)
+    if entry is None or entry[0] != signature:
+        entry = (signature, loader())
+        _cache[key] = entry
+    return entry[1]
+
+
+def cached_query(path, loader, name):
+    """
+    مثل cached_read برای نتیجه یک پرس‌وجوی دلخواه؛ فقط QUERY_CACHE_ENTRIES نتیجه
+    اخیر نگهداری می‌شود و قدیمی‌ترین نتیجه کنار گذاشته می‌شود
+    """
+    key, signature = (path, name), file_signature(path)
+    with _query_lock:
+        entry = _query_cache.get(key)
+        if entry is not None and entry[0] == signature:
+            _query_cache.move_to_end(key)
+            return entry[1].copy(deep=False)
+
+    result = loader()
+    with _query_lock:
+        _query_cache[key] = (signature, result)
+        _query_cache.move_to_end(key)
+        while len(_query_cache) > QUERY_CACHE_ENTRIES:
+            _query_cache.popitem(last=False)
+    return result.copy(deep=False)
+
+
+def invalidate(path):
+    """حذف تمام داده‌های کش‌شده یک فایل"""
+    for key in [key for key in _cache if key[0] == path]:
+        del _cache[key]
+    with _query_lock:
+        for key in [key for key in _query_cache if key[0] == path]:
+            del _query_cache[key]
+
+
+# ---------------------
+# 📦 نسخه ستونی (Parquet) کنار هر فایل اکسل
+# ---------------------
+def snapshot_path(path):
+    """مسیر فایل Parquet متناظر با یک فایل اکسل"""
+    return os.path.splitext(path)[0] + ".parquet"
+
+
+def _snapshot_is_fresh(path):
+    """آیا نسخه Parquet وجود دارد و از فایل اکسل قدیمی‌تر نیست؟"""
+    snapshot = file_signature(snapshot_path(path))
+    source = file_signature(path)
+    return snapshot is not None and source is not None and snapshot[0] >= source[0]
+
+
+def _arrow_safe(df):
+    """تبدیل ستون‌هایی که مقادیر با نوع‌های مختلف دارند (مثلاً عدد و متن) به متن"""
+    df = df.copy()
+    for column in df.columns:
+        if df[column].dtype == object:
+            values = df[column].dropna()
+            if values.map(type).nunique() > 1:
+                df[column] = df[column].map(lambda v: v if pd.isna(v) else str(v))
+    return df
+
+
+def write_snapshot(path, df):
+    """نوشتن نسخه Parquet یک جدول؛ در صورت خطا نسخه قدیمی حذف می‌شود تا از اکسل خوانده شود"""
+    snapshot = snapshot_path(path)
+    try:
+        try:
+            df.to_parquet(snapshot, index=False)
+        except (TypeError, ValueError):
+            _arrow_safe(df).to_parquet(snapshot, index=False)
+    except Exception as e:
+        print("Error in write_snapshot:", e)
+        if os.path.exists(snapshot):
+            os.remove(snapshot)
+
+
+# ---------------------
+# 📝 ژورنال افزایشی (write-ahead log)
+# ---------------------
+# ثبت رکورد جدید فقط یک خط JSON به انتهای ژورنال اضافه می‌کند و هزینه آن
+# به اندازه جدول بستگی ندارد. حذف هم فقط یک خط (tombstone) با شناسه رکوردهاست.
+# فشرده‌سازی ژورنال را در فایل اکسل و Parquet ادغام می‌کند و رکوردهای حذف‌شده را کنار می‌گذارد.
+JOURNAL_COMPACT_BYTES = 256 * 1024
+
+# قفل کوتاه برای دسترسی به ژورنال و جابه‌جایی فایل‌ها
+_locks = defaultdict(threading.RLock)
+# قفل بلند برای جلوگیری از هم‌زمانی فشرده‌سازی و ذخیره کامل
+_compact_locks = defaultdict(threading.Lock)
+
+
+def journal_path(path):
+    """مسیر ژورنال یک جدول"""
+    return path + ".journal"
+
+
+def _compacting_path(path):
+    """مسیر ژورنالی که در حال ادغام با جدول اصلی است"""
+    return path + ".journal.compacting"
+
+
+def _saved_files(path):
+    """
+    ژورنال‌هایی که هنگام ذخیره کامل کنار گذاشته شده‌اند، به ترتیب قدیمی به جدید.
+    تا وقتی نخ نویسنده جدول جدید را ننوشته، روی دیسک می‌مانند.
+    """
+    return sorted(glob.glob(glob.escape(path) + ".journal.saved.*"))
+
+
+def _journal_files(path):
+    """
+    فایل‌های ژورنال به ترتیب قدیمی به جدید.
+    ژورنال‌های کنار گذاشته‌شده فقط وقتی حساب می‌شوند که ذخیره‌ای در صف نباشد؛
+    جدول در صف رکوردهای آن‌ها را دارد.
+    """
+    saved = [] if path in _pending else _saved_files(path)
+    return saved + [_compacting_path(path), journal_path(path)]
+
+
+def _read_journal(path):
+    """خواندن تمام رکوردهای ژورنال یک جدول"""
+    records = []
+    for journal in _journal_files(path):
+        if os.path.exists(journal):
+            with open(journal, encoding="utf-8") as f:
+                records.extend(json.loads(line) for line in f if line.strip())
+    return records
+
+
+def _deleted_keys(records):
+    """شناسه‌های حذف‌شده در ژورنال: ستون کلید ← مجموعه مقادیر"""
+    deleted = defaultdict(set)
+    for record in records:
+        if record["op"] == "delete":
+            deleted[record["column"]].update(record["values"])
+    return deleted
+
+
+def _replay(base, records):
+    """اعمال رکوردهای ژورنال (افزودن و حذف) روی جدول پایه"""
+    if not records:
+        return base
+    inserts = [record["row"] for record in records if record["op"] == "insert"]
+    df = base
+    if inserts:
+        journal = pd.DataFrame(inserts)
+        if len(base.columns):
+            journal = journal.reindex(columns=base.columns)
+        df = journal if base.empty else pd.concat([base, journal], ignore_index=True)
+
+    # شناسه‌های یکتا دوباره ثبت نمی‌شوند؛ پس ترتیب حذف و افزودن اهمیتی ندارد
+    deleted = _deleted_keys(records)
+    if deleted:
+        keep = pd.Series(True, index=df.index)
+        for column, values in deleted.items():
+            if column in df.columns:
+                keep &= ~df[column].astype(str).isin(values)
+        df = df[keep].reset_index(drop=True)
+    return df
+
+
+def _append_journal(path, record):
+    """افزودن یک خط به ژورنال جدول و ادغام در پس‌زمینه وقتی ژورنال بزرگ شد"""
+    line = json.dumps(record, ensure_ascii=False, default=str)
+    journal = journal_path(path)
+    with _locks[path]:
+        with open(journal, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        size = os.path.getsize(journal)
+
+    # ادغام در پس‌زمینه وقتی ژورنال بزرگ شد
+    if size >= JOURNAL_COMPACT_BYTES:
+        threading.Thread(target=compact_table, args=(path,), daemon=True).start()
+
+
+def append_record(path, row):
+    """
+    افزودن یک رکورد به ژورنال جدول با هزینه ثابت
+    :param row: دیکشنری ستون ← مقدار
+    """
+    _append_journal(path, {"op": "insert", "row": row})
+
+
+def delete_records(path, values, column="ID"):
+    """
+    حذف رکوردها با شناسه، با هزینه ثابت: فقط یک tombstone به ژورنال اضافه می‌شود
+    و رکوردها در فشرده‌سازی بعدی از فایل اصلی حذف می‌شوند.
+    :param values: شناسه‌های رکوردهای حذف‌شده
+    :param column: ستون شناسه
+    """
+    _append_journal(path, {"op": "delete", "column": column, "values": [str(v) for v in values]})
+
+
+def assign_ids(df, column="ID"):
+    """
+    شناسه UUID برای ردیف‌هایی که شناسه ندارند (داده‌های قبل از اضافه شدن شناسه)
+    :return: (دیتافریم, True اگر شناسه‌ای اضافه شد)
+    """
+    missing = df[column].isna() if column in df.columns else pd.Series(True, index=df.index)
+    if not missing.any():
+        return df, False
+    df = df.copy()
+    if column not in df.columns:
+        df.insert(0, column, None)
+    df[column] = df[column].astype(object)
+    df.loc[missing, column] = [str(uuid.uuid4()) for _ in range(int(missing.sum()))]
+    return df, True
+
+
+def _fsync_file(path):
+    """اطمینان از نوشته شدن محتوای فایل روی دیسک"""
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            os.fsync(f.fileno())
+
+
+def _write_base(path, df):
+    """نوشتن اتمیک فایل اکسل و Parquet در فایل‌های موقت؛ مسیر فایل‌های موقت را برمی‌گرداند"""
+    root, ext = os.path.splitext(path)
+    tmp_path = f"{root}.tmp{ext}"
+    tmp_snapshot = f"{root}.tmp.parquet"
+    df.to_excel(tmp_path, index=False)
+    write_snapshot(tmp_path, df)
+    _fsync_file(tmp_path)
+    _fsync_file(tmp_snapshot)
+    return tmp_path, tmp_snapshot
+
+
+def _swap_base(path, tmp_path, tmp_snapshot, merged):
+    """
+    جایگزینی فایل‌های اصلی با فایل‌های موقت و حذف ژورنال‌هایی که در آن‌ها ادغام شده‌اند
+    :param merged: فایل‌های ژورنالی که رکوردهایشان در جدول جدید وجود دارد
+    """
+    os.replace(tmp_path, path)
+    if os.path.exists(tmp_snapshot):
+        os.replace(tmp_snapshot, snapshot_path(path))
+    for journal in merged:
+        if os.path.exists(journal):
+            os.remove(journal)
+    invalidate(path)
+
+
+def _discard_base(tmp_path, tmp_snapshot):
+    """حذف فایل‌های موقتی که دیگر لازم نیستند"""
+    for tmp in (tmp_path, tmp_snapshot):
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def compact_table(path):
+    """ادغام ژورنال یک جدول در فایل اکسل و Parquet"""
+    with _compact_locks[path]:
+        with _locks[path]:
+            # ذخیره کاملی که در صف است خودش جدول پایه را می‌نویسد؛ ادغام به بعد موکول می‌شود
+            if path in _pending:
+                return
+            if os.path.exists(journal_path(path)) and not os.path.exists(_compacting_path(path)):
+                os.replace(journal_path(path), _compacting_path(path))
+            merged = [f for f in _saved_files(path) + [_compacting_path(path)] if os.path.exists(f)]
+            if not merged:
+                return
+            base = _read_base(path, [])
+            records = []
+            for journal in merged:
+                with open(journal, encoding="utf-8") as f:
+                    records.extend(json.loads(line) for line in f if line.strip())
+
+        # نوشتن کند خارج از قفل انجام می‌شود تا ثبت رکوردهای جدید منتظر نماند
+        tmp_path, tmp_snapshot = _write_base(path, _replay(base, records))
+
+        with _locks[path]:
+            if path in _pending:
+                # در این فاصله جدول کامل ذخیره شد و ژورنال‌ها را کنار گذاشت؛ نتیجه ادغام کهنه است
+                _discard_base(tmp_path, tmp_snapshot)
+                return
+            _swap_base(path, tmp_path, tmp_snapshot, merged)
+
+
+def compact_all(directory="."):
+    """ادغام تمام ژورنال‌های موجود در یک دایرکتوری"""
+    journals = (
+        glob.glob(os.path.join(directory, "*.journal")) + glob.glob(os.path.join(directory, "*.journal.compacting"))
+        + glob.glob(os.path.join(directory, "*.journal.saved.*"))
+    )
+    for path in {journal.split(".journal")[0] for journal in journals}:
+        compact_table(path)
+
+
+# ---------------------
+# 📗 جداول اکسل
+# ---------------------
+def _read_base(path, columns):
+    """خواندن جدول پایه از Parquet یا در صورت نیاز از اکسل"""
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=columns)
+    if _snapshot_is_fresh(path):
+        return pd.read_parquet(snapshot_path(path))
+    df = pd.read_excel(path)
+    write_snapshot(path, df)
+    return df
+
+
+def _table_signature(path):
+    """امضای جدول: فایل اصلی، فایل‌های ژورنال و نسخه ذخیره در صف"""
+    return (
+        (file_signature(path),) + tuple(file_signature(f) for f in _journal_files(path))
+        + (_pending_version(path),)
+    )
+
+
+def load_table(path, columns):
+    """
+    بارگذاری یک جدول با کش: جدول پایه به همراه رکوردهای ژورنال.
+    جدول پایه از نسخه Parquet خوانده می‌شود و فقط اگر آن نسخه وجود نداشته
+    باشد یا قدیمی باشد از فایل اکسل.
+    :param columns: ستون‌های جدول خالی وقتی فایل وجود ندارد
+    """
+    signature = _table_signature(path)
+
+    def loader():
+        with _locks[path]:
+            records = _read_journal(path)
+            pending = _pending.get(path)
+            if pending:
+                # جدولی که هنوز در صف نوشتن است از حافظه خوانده می‌شود
+                base = pending[1]
+            else:
+                base = cached_read(path, lambda: _read_base(path, columns), "base")
+        return _replay(base, records)
+
+    return cached_read(path, loader, "", signature)
+
+
+def load_derived(path, columns, name, build):
+    """
+    ساخت داده مشتق از یک جدول (مثلاً دیکشنری شناسه ← نام) و کش آن تا تغییر جدول.
+    مقدار برگردانده شده بین اجراها مشترک است و نباید تغییر داده شود.
+    :param build: تابعی که دیتافریم جدول را می‌گیرد و داده مشتق را می‌سازد
+    """
+    return _cached(
+        (path, "derived:" + name), _table_signature(path),
+        lambda: build(load_table(path, columns))
+    )
+
+
+def load_id_index(path, columns, column="ID"):
+    """
+    دیکشنری شناسه ← شماره ردیف در load_table، با کش تا تغییر جدول
+    (نباید تغییر داده شود)
+    """
+    return load_derived(
+        path, columns, "ids:" + column,
+        lambda df: dict(zip(df[column].astype(str), range(len(df))))
+    )
+
+
+# جمع‌های گروهی هر جدول: کلید (مسیر، ستون گروه، ستون مقدار) ← وضعیت
+_sums = {}
+
+
+def _journal_since(path, offset):
+    """رکوردهایی از ژورنال که بعد از بایت offset اضافه شده‌اند: (رکوردها, تعداد بایت‌های خوانده‌شده)"""
+    if not os.path.exists(journal_path(path)):
+        return [], 0
+    with open(journal_path(path), "rb") as f:
+        f.seek(offset)
+        lines = f.read()
+    return [json.loads(line) for line in lines.decode("utf-8").splitlines() if line.strip()], len(lines)
+
+
+def _numeric(value):
+    """مقدار عددی یک خانه؛ مقدار نامعتبر یا خالی صفر حساب می‌شود"""
+    value = pd.to_numeric(value, errors="coerce")
+    return 0 if pd.isna(value) else value
+
+
+def load_sums(path, columns, group_column, value_column="Amount"):
+    """
+    جمع یک ستون به تفکیک گروه (مثلاً مبلغ به تفکیک نوع چک).
+    تا وقتی جدول پایه تغییر نکرده، فقط رکوردهای جدید ژورنال روی جمع‌ها اعمال می‌شوند:
+    رکورد جدید اضافه و رکورد حذف‌شده (با سهمی که برای شناسه‌اش نگه داشته شده) کم می‌شود؛
+    پس هزینه هر ثبت یا حذف ثابت است و کل جدول دوباره پیمایش نمی‌شود.
+    :return: دیکشنری گروه ← جمع (نباید تغییر داده شود)
+    """
+    key = (path, group_column, value_column)
+    with _locks[path]:
+        base_signature = (file_signature(path), file_signature(_compacting_path(path)), _pending_version(path))
+        state = _sums.get(key)
+        if state is None or state["signature"] != base_signature:
+            journal = journal_path(path)
+            offset = os.path.getsize(journal) if os.path.exists(journal) else 0
+            df = load_table(path, columns)
+            values = pd.to_numeric(df[value_column], errors="coerce").fillna(0)
+            state = {
+                "signature": base_signature,
+                "offset": offset,
+                "sums": values.groupby(df[group_column]).sum().to_dict(),
+                # شناسه ← (گروه، مقدار)، برای کم کردن سهم رکوردهای حذف‌شده
+                "rows": dict(zip(df["ID"].astype(str), zip(df[group_column], values))),
+            }
+            _sums[key] = state
+        else:
+            records, size = _journal_since(path, state["offset"])
+            if any(record["op"] == "delete" and record["column"] != "ID" for record in records):
+                # سهم رکوردها فقط با شناسه نگه داشته شده؛ جمع‌ها یک بار از کل جدول ساخته می‌شوند
+                del _sums[key]
+                return load_sums(path, columns, group_column, value_column)
+            state["offset"] += size
+            if records:
+                # کپی پیش از تغییر، چون خواننده‌های قبلی ممکن است دیکشنری را نگه داشته باشند
+                sums, rows = dict(state["sums"]), state["rows"]
+                for record in records:
+                    if record["op"] == "insert":
+                        row = record["row"]
+                        group, value = row.get(group_column), _numeric(row.get(value_column))
+                        sums[group] = sums.get(group, 0) + value
+                        rows[str(row.get("ID"))] = (group, value)
+                        continue
+                    for deleted in record["values"]:
+                        if deleted in rows:
+                            group, value = rows.pop(deleted)
+                            if group in sums:
+                                sums[group] -= value
+                state["sums"] = sums
+    return state["sums"]
+
+
+# ایندکس‌های مرتب هر جدول: کلید (مسیر، ستون) ← وضعیت
+_sorted = {}
+
+
+def load_sorted(path, columns, column, make_keys):
+    """
+    ایندکس مرتب یک ستون (مثلاً تاریخ سررسید) برای جستجوی بازه‌ای با bisect.
+    مثل load_sums تا وقتی جدول پایه تغییر نکرده، فقط رکوردهای جدید ژورنال اعمال می‌شوند:
+    رکورد جدید با bisect در جای خود درج و رکورد حذف‌شده با bisect پیدا و برداشته می‌شود؛
+    پس جدول دوباره مرتب نمی‌شود.
+    :param make_keys: تابعی که یک ستون را به کلیدهای قابل مقایسه تبدیل می‌کند (None برای مقدار نامعتبر)
+    :return: (کلیدهای مرتب, شماره ردیف هر کلید در load_table) - نباید تغییر داده شوند
+    """
+    key = (path, column)
+    with _locks[path]:
+        base_signature = (file_signature(path), file_signature(_compacting_path(path)), _pending_version(path))
+        state = _sorted.get(key)
+        if state is None or state["signature"] != base_signature:
+            journal = journal_path(path)
+            offset = os.path.getsize(journal) if os.path.exists(journal) else 0
+            df = load_table(path, columns)
+            row_keys = pd.Series(make_keys(df[column]).to_numpy(), index=range(len(df)))
+            keys = row_keys.dropna().sort_values(kind="stable")
+            state = {
+                "signature": base_signature,
+                "offset": offset,
+                "keys": keys.tolist(),
+                "positions": keys.index.tolist(),
+                # شناسه و کلید هر ردیف به ترتیب ردیف‌ها، برای پیدا کردن رکوردهای حذف‌شده
+                "ids": df["ID"].astype(str).tolist(),
+                "row_keys": row_keys.tolist(),
+            }
+            _sorted[key] = state
+        else:
+            records, size = _journal_since(path, state["offset"])
+            if any(record["op"] == "delete" and record["column"] != "ID" for record in records):
+                # ردیف‌ها فقط با شناسه پیدا می‌شوند؛ ایندکس یک بار دوباره ساخته می‌شود
+                del _sorted[key]
+                return load_sorted(path, columns, column, make_keys)
+            if records:
+                # کپی پیش از تغییر، چون خواننده‌های قبلی ممکن است لیست‌ها را نگه داشته باشند
+                keys, positions = list(state["keys"]), list(state["positions"])
+                ids, row_keys = state["ids"], state["row_keys"]
+                for record in records:
+                    if record["op"] == "insert":
+                        row = record["row"]
+                        new_key = make_keys(pd.Series([row.get(column)], dtype=object)).iloc[0]
+                        new_key = None if pd.isna(new_key) else new_key
+                        if new_key is not None:
+                            at = bisect.bisect_right(keys, new_key)
+                            keys.insert(at, new_key)
+                            positions.insert(at, len(ids))
+                        ids.append(str(row.get("ID")))
+                        row_keys.append(new_key)
+                        continue
+                    keys, positions = _remove_sorted(keys, positions, ids, row_keys, record["values"])
+                state = dict(state, keys=keys, positions=positions)
+            state["offset"] += size
+            _sorted[key] = state
+    return state["keys"], state["positions"]
+
+
+def _remove_sorted(keys, positions, ids, row_keys, deleted):
+    """
+    برداشتن ردیف‌های حذف‌شده از ایندکس مرتب (با bisect روی کلیدشان) و جابه‌جا کردن
+    شماره ردیف‌های بعدی؛ ids و row_keys درجا به‌روز می‌شوند
+    :return: (کلیدها, شماره ردیف‌ها)
+    """
+    deleted = set(deleted)
+    removed = sorted(p for p, row_id in enumerate(ids) if row_id in deleted)
+    if not removed:
+        return keys, positions
+    for p in removed:
+        if pd.isna(row_keys[p]):
+            continue
+        at = bisect.bisect_left(keys, row_keys[p])
+        while positions[at] != p:
+            at += 1
+        del keys[at]
+        del positions[at]
+    for p in reversed(removed):
+        del ids[p]
+        del row_keys[p]
+    # هر شماره ردیف به اندازه تعداد ردیف‌های حذف‌شده پیش از آن کم می‌شود
+    positions = np.asarray(positions, dtype=np.int64)
+    positions -= np.searchsorted(removed, positions)
+    return keys, positions.tolist()
+
+
+def sorted_range(index, start=None, end=None):
+    """
+    شماره ردیف‌هایی که کلیدشان در بازه [start, end] است، به ترتیب کلید
+    :param index: خروجی load_sorted
+    """
+    keys, positions = index
+    low = 0 if start is None else bisect.bisect_left(keys, start)
+    high = len(keys) if end is None else bisect.bisect_right(keys, end)
+    return positions[low:high]
+
+
+def due_positions(path, columns, start_date=None, end_date=None, column="Due Date"):
+    """
+    شماره ردیف‌هایی که تاریخ سررسیدشان در بازه است، به ترتیب تاریخ.
+    بازه با bisect روی ایندکس مرتب تاریخ‌ها (load_sorted) پیدا می‌شود.
+    :param start_date: تاریخ میلادی YYYY/MM/DD (None یعنی از ابتدا)
+    :param end_date: تاریخ میلادی YYYY/MM/DD (None یعنی تا انتها)
+    """
+    from date_utils import gregorian_keys
+
+    return sorted_range(load_sorted(path, columns, column, gregorian_keys), start_date, end_date)
+
+
+def rows_due_between(path, columns, loader, start_date=None, end_date=None):
+    """
+    ردیف‌هایی از جدول که تاریخ سررسیدشان در بازه است؛ فقط همان ردیف‌ها برداشته می‌شوند
+    :param loader: تابع بارگذاری کامل جدول (مثلاً load_checks_data)
+    """
+    positions = due_positions(path, columns, start_date, end_date)
+    return loader().iloc[positions]
+
+
+def _write_table(path, df, superseded):
+    """
+    نوشتن کامل یک جدول در فایل اکسل و نسخه Parquet آن (در نخ نویسنده)
+    :param superseded: ژورنال‌های کنار گذاشته‌شده هنگام ذخیره؛ فقط بعد از جایگزینی موفق حذف می‌شوند
+    """
+    tmp_path, tmp_snapshot = _write_base(path, df)
+    with _locks[path]:
+        _swap_base(path, tmp_path, tmp_snapshot, superseded)
+
+
+def save_table(path, df):
+    """
+    ذخیره کامل یک جدول بدون انتظار برای نوشتن فایل.
+    جدول جدید بلافاصله به خواننده‌ها داده می‌شود و نخ نویسنده آن را در پس‌زمینه ذخیره می‌کند.
+    ژورنال فعلی (که رکوردهایش در df وجود دارد) فقط کنار گذاشته می‌شود و بعد از نوشته شدن
+    جدول حذف می‌شود؛ اگر نوشتن شکست بخورد یا برنامه بسته شود، رکوردهای آن از دست نمی‌روند.
+    """
+    with _locks[path]:
+        superseded = _saved_files(path)
+        for journal in (_compacting_path(path), journal_path(path)):
+            if os.path.exists(journal):
+                saved = f"{path}.journal.saved.{time.time_ns():020d}"
+                while os.path.exists(saved) or saved in superseded:
+                    saved = f"{path}.journal.saved.{time.time_ns():020d}"
+                os.replace(journal, saved)
+                superseded.append(saved)
+        enqueue_write(path, df, lambda path, df: _write_table(path, df, superseded))
+
+
+# ---------------------
+# ⏳ صف نوشتن در پس‌زمینه (write-behind)
+# ---------------------
+# هر ذخیره کامل فقط در صف قرار می‌گیرد و برمی‌گردد. نخ نویسنده برای هر فایل
+# فقط آخرین نسخه را می‌نویسد؛ پس چند ذخیره پشت سر هم یک بار نوشته می‌شوند.
+# کلید: مسیر فایل ← (نسخه، داده، تابع نوشتن)
+_pending = {}
+_failed = set()
+_queue_condition = threading.Condition()
+_versions = itertools.count(1)
+_writer = None
+
+
+def _pending_version(path):
+    """نسخه ذخیره در صف یک فایل؛ None اگر چیزی در صف نباشد"""
+    pending = _pending.get(path)
+    return pending[0] if pending else None
+
+
+def _drop_pending(path, version):
+    """حذف ذخیره از صف، اگر در این فاصله نسخه جدیدتری در صف قرار نگرفته باشد"""
+    with _queue_condition:
+        if _pending_version(path) == version:
+            del _pending[path]
+            _failed.discard(path)
+        _queue_condition.notify_all()
+
+
+def enqueue_write(path, data, write):
+    """
+    قرار دادن یک ذخیره در صف؛ نسخه قبلی همان فایل که هنوز نوشته نشده جایگزین می‌شود
+    :param data: داده‌ای که باید نوشته شود
+    :param write: تابعی که (path, data) را می‌گیرد و داده را به صورت پایدار می‌نویسد
+    """
+    global _writer
+    with _queue_condition:
+        _pending[path] = (next(_versions), data, write)
+        _failed.discard(path)
+        if _writer is None:
+            _writer = threading.Thread(target=_writer_loop, name="write-behind", daemon=True)
+            _writer.start()
+        _queue_condition.notify_all()
+
+
+def _write_pending(path):
+    """نوشتن آخرین نسخه در صف یک فایل"""
+    with _compact_locks[path]:
+        with _queue_condition:
+            pending = _pending.get(path)
+        if pending is None:
+            return
+        version, data, write = pending
+        try:
+            write(path, data)
+        except Exception as e:
+            print("Error in write-behind:", path, e)
+            with _queue_condition:
+                _failed.add(path)
+                _queue_condition.notify_all()
+            return
+        _drop_pending(path, version)
+
+
+def _writer_loop():
+    """نخ نویسنده: فایل‌های در صف را یکی یکی می‌نویسد"""
+    while True:
+        with _queue_condition:
+            while not [path for path in _pending if path not in _failed]:
+                _queue_condition.wait()
+            path = next(path for path in _pending if path not in _failed)
+        _write_pending(path)
+
+
+def flush(path=None, timeout=None):
+    """
+    صبر تا نوشته شدن ذخیره‌های در صف (برای خروج برنامه، تست‌ها و عملیاتی که باید داده روی دیسک باشد)
+    ذخیره‌هایی که قبلاً با خطا مواجه شده‌اند دوباره امتحان می‌شوند.
+    :param path: فقط همین فایل (None یعنی همه فایل‌ها)
+    :return: True اگر چیزی در صف باقی نمانده باشد
+    """
+    if threading.current_thread() is _writer:
+        return True
+
+    def waiting():
+        return [p for p in _pending if path is None or p == path]
+
+    with _queue_condition:
+        if not waiting():
+            return True
+        _failed.difference_update(waiting())
+        _queue_condition.notify_all()
+        _queue_condition.wait_for(
+            lambda: all(p in _failed for p in waiting()), timeout
+        )
+        return not waiting()
+
+
+atexit.register(flush)
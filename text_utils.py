@@ -0,0 +1,40 @@
+from format_utils import LATIN_DIGITS
+
+# ---------------------
+# 🔤 یکسان‌سازی متن فارسی برای جستجو
+# ---------------------
+# ی و ک عربی، نیم‌فاصله، کشیده، اعراب و ارقام فارسی/عربی به یک شکل درمی‌آیند تا
+# «علي» و «علی» یا «۱۲۳» و «123» یکی باشند. نیم‌فاصله به فاصله تبدیل می‌شود تا
+# «کتاب‌ها» با جستجوی «کتاب» پیدا شود.
+_CHARACTERS = {
+    "ي": "ی", "ى": "ی", "ئ": "ی",
+    "ك": "ک",
+    "ة": "ه", "ۀ": "ه",
+    "أ": "ا", "إ": "ا", "ٱ": "ا",
+    "ؤ": "و",
+    "‌": " ", "‍": "", "‎": "", "‏": "",
+    "ـ": "",
+}
+# فتحه، ضمه، کسره، تنوین‌ها، تشدید و سکون
+_CHARACTERS.update({chr(code): "" for code in range(0x064B, 0x0653)})
+
+NORMALIZE_TABLE = {**LATIN_DIGITS, **str.maketrans(_CHARACTERS)}
+
+
+def normalize_text(text):
+    """یکسان‌سازی یک متن؛ مقادیر خالی به رشته خالی تبدیل می‌شوند"""
+    if text is None or text != text:
+        return ""
+    return " ".join(str(text).translate(NORMALIZE_TABLE).lower().split())
+
+
+def match_query(query):
+    """
+    تبدیل عبارت جستجوی کاربر به عبارت MATCH ایندکس متنی (FTS5).
+    هر کلمه به صورت پیشوندی جستجو می‌شود و همه کلمات باید در رکورد باشند.
+    :return: عبارت MATCH یا None اگر کلمه‌ای وارد نشده باشد
+    """
+    words = normalize_text(query).split()
+    if not words:
+        return None
+    return " ".join('"' + word.replace('"', '""') + '"*' for word in words)
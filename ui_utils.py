@@ -0,0 +1,66 @@
+import math
+
+import pandas as pd
+import streamlit as st
+
+# ---------------------
+# 📑 صفحه‌بندی جدول‌ها
+# ---------------------
+PAGE_SIZES = [10, 25, 50, 100]
+DEFAULT_PAGE_SIZE = 25
+
+
+def paginate(df, key, sort_columns=None, search_columns=None, page_sizes=None):
+    """
+    صفحه‌بندی سمت سرور: فیلتر و مرتب‌سازی روی کل جدول و سپس برش صفحه جاری.
+    ردیف‌های برگردانده شده ایندکس اصلی خود را حفظ می‌کنند.
+    :param df: دیتافریم کامل
+    :param key: پیشوند کلید ویجت‌ها (برای چند جدول در یک صفحه)
+    :param sort_columns: دیکشنری عنوان فارسی ← نام ستون برای مرتب‌سازی
+    :param search_columns: ستون‌هایی که جستجوی متنی روی آن‌ها انجام می‌شود
+    :param page_sizes: گزینه‌های تعداد ردیف در هر صفحه
+    :return: دیتافریم ردیف‌های صفحه جاری
+    """
+    page_sizes = page_sizes or PAGE_SIZES
+    cols = st.columns(4)
+
+    if search_columns:
+        with cols[0]:
+            query = st.text_input("جستجو", key=f"{key}_search")
+        if query:
+            mask = pd.Series(False, index=df.index)
+            for column in search_columns:
+                mask |= df[column].astype(str).str.contains(query, regex=False, na=False)
+            df = df[mask]
+
+    if sort_columns:
+        with cols[1]:
+            sort_label = st.selectbox("مرتب‌سازی", ["ترتیب ثبت"] + list(sort_columns), key=f"{key}_sort")
+        with cols[2]:
+            descending = st.checkbox("نزولی", key=f"{key}_desc")
+        if sort_label != "ترتیب ثبت":
+            column = sort_columns[sort_label]
+            try:
+                df = df.sort_values(column, ascending=not descending, kind="stable")
+            except TypeError:
+                # ستون با مقادیر عدد و متن مخلوط به صورت متنی مرتب می‌شود
+                df = df.sort_values(column, ascending=not descending, kind="stable", key=lambda s: s.astype(str))
+        elif descending:
+            df = df.iloc[::-1]
+
+    with cols[3]:
+        page_size = st.selectbox(
+            "تعداد در صفحه", page_sizes,
+            index=page_sizes.index(DEFAULT_PAGE_SIZE) if DEFAULT_PAGE_SIZE in page_sizes else 0,
+            key=f"{key}_page_size"
+        )
+
+    page_count = max(1, math.ceil(len(df) / page_size))
+    page_key = f"{key}_page"
+    if st.session_state.get(page_key, 1) > page_count:
+        st.session_state[page_key] = page_count
+    page = st.number_input("صفحه", min_value=1, max_value=page_count, step=1, key=page_key)
+
+    st.caption(f"{len(df)} رکورد - صفحه {page} از {page_count}")
+    start = (page - 1) * page_size
+    return df.iloc[start:start + page_size]
@@ -0,0 +1,5 @@
+"""
+صفحه‌های برنامه؛ هر ماژول یک تابع render(menu) دارد.
+app.py فقط ماژول صفحه انتخاب‌شده را بارگذاری می‌کند تا هر اجرا
+فقط ماژول‌ها و داده‌های همان صفحه را بخواند.
+"""
@@ -0,0 +1,117 @@
+import streamlit as st
+
+from engine import load_balances, add_bank, bank_totals
+from format_utils import format_currency, format_currency_series
+
+
+# ---------------------
+# 🏦 ایجاد حساب جدید
+# ---------------------
+def create_account():
+    """صفحه ایجاد حساب بانکی جدید"""
+    balances = load_balances()
+    st.header("ایجاد حساب بانکی جدید")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        bank_name = st.text_input("نام بانک")
+    with col2:
+        amount = st.text_input("مبلغ اولیه", value="0", key="initial_amount")
+
+    # نمایش پیش‌نمایش مبلغ
+    if amount:
+        try:
+            cleaned_amount = amount.replace(",", "").replace(" ", "")
+            if cleaned_amount:  # فقط اگر مقدار خالی نباشد
+                formatted_amount = format_currency(cleaned_amount)
+                st.caption(f"مبلغ به عدد: {formatted_amount}")
+        except:
+            pass
+
+    if st.button("ایجاد حساب", type="primary"):
+        try:
+            # اعتبارسنجی نام بانک
+            if not bank_name or not bank_name.strip():
+                st.error("لطفاً نام بانک را وارد کنید.")
+                return
+
+            # پردازش و اعتبارسنجی مبلغ
+            cleaned_amount = amount.replace(",", "").replace(" ", "").strip()
+
+            if not cleaned_amount:  # اگر مقدار خالی باشد
+                st.error("لطفاً مبلغ را وارد کنید.")
+                return
+
+            try:
+                initial_amount = float(cleaned_amount)
+            except ValueError:
+                st.error("لطفاً یک عدد معتبر وارد کنید (مثال: 1000000 یا 1,000,000)")
+                return
+
+            if initial_amount < 0:
+                st.error("مبلغ نمی‌تواند منفی باشد.")
+                return
+
+            # ایجاد حساب جدید؛ False یعنی نام بانک تکراری است
+            if not add_bank(balances, bank_name, initial_amount):
+                st.warning("این بانک قبلاً ثبت شده است.")
+                return
+
+            st.success(f"""
+            ✅ حساب بانکی با موفقیت ایجاد شد:
+            - نام بانک: {bank_name}
+            - موجودی اولیه: {format_currency(initial_amount)} ریال
+            """)
+
+        except Exception as e:
+            st.error(f"خطای غیرمنتظره: {str(e)}")
+
+
+# ---------------------
+# 📄 لیست حساب‌ها
+# ---------------------
+def accounts_list():
+    """صفحه لیست حساب‌ها"""
+    balances = load_balances()
+    st.header("لیست حساب‌های موجود")
+
+    if len(balances) == 0:
+        st.info("هیچ حسابی موجود نیست.")
+    else:
+        # تغییر نام ستون‌ها به فارسی
+        display_df = balances.to_frame()
+
+        # جمع واریز و برداشت هر بانک از جدول جمع‌ها خوانده می‌شود
+        totals = bank_totals()
+        display_df["واریز"] = display_df["Bank Name"].map(totals["واریز"]).fillna(0)
+        display_df["برداشت"] = display_df["Bank Name"].map(totals["برداشت"]).fillna(0)
+        display_df.columns = ["نام بانک", "موجودی", "جمع واریز", "جمع برداشت"]
+
+        # فرمت کردن مبالغ با کاما
+        for column in ["موجودی", "جمع واریز", "جمع برداشت"]:
+            display_df[column] = format_currency_series(display_df[column])
+
+        # جمع کل موجودی‌ها همراه هر تغییر به‌روز شده است
+        total_balance = balances.total_balance()
+
+        # استفاده از st.dataframe برای نمایش زیباتر
+        st.dataframe(
+            display_df,
+            column_config={
+                "نام بانک": st.column_config.TextColumn("نام بانک", width="medium"),
+                "موجودی": st.column_config.TextColumn("موجودی (ریال)", width="medium"),
+                "جمع واریز": st.column_config.TextColumn("جمع واریز (ریال)", width="medium"),
+                "جمع برداشت": st.column_config.TextColumn("جمع برداشت (ریال)", width="medium")
+            },
+            hide_index=True,
+            use_container_width=True
+        )
+
+        st.markdown(f"**جمع کل موجودی‌ها:** {format_currency(total_balance)} ریال")
+
+
+def render(menu):
+    if menu == "ایجاد حساب":
+        create_account()
+    else:
+        accounts_list()
@@ -0,0 +1,31 @@
+import streamlit as st
+
+from engine import load_balances, read_statement, import_transactions
+
+
+# ---------------------
+# 📥 ورود گروهی تراکنش‌ها
+# ---------------------
+def render(menu):
+    """صفحه ورود گروهی تراکنش‌ها از فایل صورتحساب"""
+    st.header("📥 ورود گروهی تراکنش‌ها از صورتحساب")
+    st.caption("ستون‌های لازم: نام بانک، نوع تراکنش (واریز/برداشت)، مبلغ، تاریخ (YYYY/MM/DD شمسی). ستون‌های علت، شخص و رسید اختیاری هستند.")
+
+    statement = st.file_uploader("فایل صورتحساب", type=["csv", "xlsx"])
+    if statement is not None:
+        try:
+            df_statement = read_statement(statement)
+        except Exception as e:
+            st.error(f"خطا در خواندن فایل: {str(e)}")
+            st.stop()
+
+        st.write(f"{len(df_statement)} ردیف خوانده شد.")
+        st.dataframe(df_statement.head(20), use_container_width=True)
+
+        if st.button("ثبت تراکنش‌ها", type="primary"):
+            count, errors = import_transactions(load_balances(), df_statement)
+            if errors.empty:
+                st.success(f"{count} تراکنش با موفقیت ثبت شد.")
+            else:
+                st.error(f"{len(errors)} خطا پیدا شد؛ هیچ تراکنشی ثبت نشد.")
+                st.dataframe(errors, hide_index=True, use_container_width=True)
@@ -0,0 +1,74 @@
+from datetime import datetime
+
+import streamlit as st
+
+from check_utils import register_check, display_checks
+from format_utils import format_currency, parse_currency
+
+
+# ---------------------
+# 📊 ثبت چک
+# ---------------------
+def render(menu):
+    """صفحه مدیریت چک‌ها"""
+    st.header("مدیریت چک‌ها")
+
+    submenu = st.radio("عملیات", ["ثبت چک جدید", "لیست چک‌ها"], horizontal=True)
+
+    if submenu == "ثبت چک جدید":
+        st.subheader("ثبت چک جدید")
+
+        col1, col2 = st.columns(2)
+        with col1:
+            check_type = st.radio("نوع چک", ["دریافتی", "صادر شده"])
+            check_number = st.text_input("شماره چک")
+            account_owner = st.text_input("نام صاحب حساب")
+
+        with col2:
+            owner_name = st.text_input("نام دارنده چک")
+            amount = st.text_input("مبلغ چک", value="0")
+            description = st.text_input("بابت")
+
+        # تاریخ وصول
+        due_date_choice = st.radio("تاریخ وصول", ["انتخاب تاریخ", "ورود دستی"], horizontal=True)
+
+        if due_date_choice == "انتخاب تاریخ":
+            due_date = st.date_input("تاریخ وصول")
+        else:
+            due_date_input = st.text_input("تاریخ وصول (YYYY/MM/DD)")
+            try:
+                due_date = datetime.strptime(due_date_input, "%Y/%m/%d").date()
+            except:
+                st.error("فرمت تاریخ نامعتبر است. لطفاً از فرمت YYYY/MM/DD استفاده کنید.")
+                due_date = None
+
+        # آپلود تصویر چک
+        check_image = st.file_uploader("تصویر چک (اختیاری)", type=["jpg", "png", "jpeg"])
+
+        if st.button("ثبت چک", type="primary"):
+            if not check_number:
+                st.error("لطفاً شماره چک را وارد کنید.")
+            elif not amount or parse_currency(amount) <= 0:
+                st.error("لطفاً مبلغ معتبر وارد کنید.")
+            elif not due_date:
+                st.error("لطفاً تاریخ وصول معتبر وارد کنید.")
+            else:
+                success, jalali_date = register_check(
+                    check_type, check_number, due_date, owner_name,
+                    parse_currency(amount), description, account_owner, check_image
+                )
+
+                if success:
+                    st.success(f"""
+                    چک با موفقیت ثبت شد:
+                    - نوع چک: {check_type}
+                    - شماره چک: {check_number}
+                    - تاریخ وصول: {jalali_date}
+                    - مبلغ: {format_currency(amount)} ریال
+                    """)
+                else:
+                    st.error(f"خطا در ثبت چک: {jalali_date}")
+
+    elif submenu == "لیست چک‌ها":
+        st.subheader("لیست چک‌ها")
+        display_checks()
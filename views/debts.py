@@ -0,0 +1,73 @@
+from datetime import datetime
+
+import streamlit as st
+
+from deb_utils import register_debt, display_debts
+from date_utils import convert_to_jalali
+from format_utils import format_currency, parse_currency
+
+
+# ---------------------
+# 📒 طلبکاران و بدهکاران
+# ---------------------
+def render(menu):
+    """صفحه مدیریت طلبکاران و بدهکاران"""
+    st.header("مدیریت طلبکاران و بدهکاران")
+
+    submenu = st.radio("عملیات", ["ثبت جدید", "لیست طلبکاران/بدهکاران"], horizontal=True, key="debt_submenu")
+
+    if submenu == "ثبت جدید":
+        st.subheader("ثبت طلبکار/بدهکار جدید")
+
+        col1, col2 = st.columns(2)
+        with col1:
+            debt_type = st.radio("نوع", ["طلبکار", "بدهکار"], horizontal=True)
+            name = st.text_input("نام شخص/شرکت")
+            amount = st.text_input("مبلغ", value="0")
+
+        with col2:
+            description = st.text_input("بابت")
+            contact = st.text_input("اطلاعات تماس (اختیاری)")
+
+        # تاریخ وصول
+        due_date_choice = st.radio("تاریخ وصول", ["انتخاب تاریخ", "ورود دستی"], horizontal=True, key="due_date_choice")
+
+        if due_date_choice == "انتخاب تاریخ":
+            due_date = st.date_input("تاریخ وصول")
+            jalali_due_date = convert_to_jalali(due_date.strftime("%Y/%m/%d"))
+        else:
+            due_date_input = st.text_input("تاریخ وصول (YYYY/MM/DD)", key="manual_due_date")
+            try:
+                jalali_due_date = due_date_input
+                due_date = datetime.strptime(due_date_input, "%Y/%m/%d").date()
+            except:
+                st.error("فرمت تاریخ نامعتبر است. لطفاً از فرمت YYYY/MM/DD استفاده کنید.")
+                due_date = None
+
+        if st.button("ثبت طلبکار/بدهکار", type="primary"):
+            if not name:
+                st.error("لطفاً نام را وارد کنید.")
+            elif not amount or parse_currency(amount) <= 0:
+                st.error("لطفاً مبلغ معتبر وارد کنید.")
+            elif not due_date:
+                st.error("لطفاً تاریخ وصول معتبر وارد کنید.")
+            else:
+                success, registered_date = register_debt(
+                    debt_type, name, parse_currency(amount), 
+                    description, jalali_due_date, contact
+                )
+
+                if success:
+                    st.success(f"""
+                    {debt_type} با موفقیت ثبت شد:
+                    - نام: {name}
+                    - مبلغ: {format_currency(amount)} ریال
+                    - تاریخ وصول: {jalali_due_date}
+                    - تاریخ ثبت: {registered_date}
+                    """)
+                else:
+                    st.error(f"خطا در ثبت {debt_type}: {registered_date}")
+
+    elif submenu == "لیست طلبکاران/بدهکاران":
+        st.subheader("لیست طلبکاران و بدهکاران")
+        display_debts()
@@ -0,0 +1,70 @@
+from datetime import datetime, timedelta
+
+import streamlit as st
+
+from check_utils import checks_due_between
+from deb_utils import debts_due_between
+from date_utils import convert_series_to_jalali, gregorian_keys
+from format_utils import format_currency, format_currency_series
+
+
+# ---------------------
+# ⏰ سررسیدهای چک‌ها و طلبکاران/بدهکاران
+# ---------------------
+def _due_table(df, columns, today):
+    """جدول نمایش یک بازه سررسید با تاریخ شمسی و تعداد روز تا سررسید"""
+    display_df = df[list(columns)].copy()
+    due = gregorian_keys(df["Due Date"])
+    display_df["Due Date"] = convert_series_to_jalali(due)
+    display_df["Days"] = (
+        (due.str.replace("/", "-").astype("datetime64[ns]") - datetime.strptime(today, "%Y/%m/%d")).dt.days
+    )
+    display_df["Amount"] = format_currency_series(display_df["Amount"])
+    display_df.columns = list(columns.values()) + ["روز مانده"]
+    return display_df
+
+
+def _due_section(title, df, columns, today):
+    """یک بخش ویجت: تعداد، جمع مبلغ و جدول"""
+    st.markdown(f"**{title}:** {len(df)} مورد - {format_currency(df['Amount'].sum() if len(df) else 0)} ریال")
+    if not df.empty:
+        st.dataframe(_due_table(df, columns, today), hide_index=True, use_container_width=True)
+
+
+CHECK_COLUMNS = {
+    "Check Type": "نوع چک", "Check Number": "شماره چک", "Owner Name": "نام دارنده",
+    "Amount": "مبلغ", "Due Date": "تاریخ وصول",
+}
+DEBT_COLUMNS = {"Type": "نوع", "Name": "نام", "Amount": "مبلغ", "Due Date": "تاریخ وصول"}
+
+
+def due_widget(days=7, overdue_days=30):
+    """
+    ویجت سررسیدها: موارد چند روز آینده و موارد گذشته از سررسید.
+    فقط ردیف‌های همان بازه‌ها از ایندکس مرتب تاریخ‌ها خوانده می‌شوند.
+    """
+    now = datetime.now()
+    today = now.strftime("%Y/%m/%d")
+    until = (now + timedelta(days=days)).strftime("%Y/%m/%d")
+    yesterday = (now - timedelta(days=1)).strftime("%Y/%m/%d")
+    since = (now - timedelta(days=overdue_days)).strftime("%Y/%m/%d")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.subheader("📝 چک‌ها")
+        _due_section(f"سررسید تا {days} روز آینده", checks_due_between(today, until), CHECK_COLUMNS, today)
+        _due_section(f"گذشته از سررسید ({overdue_days} روز اخیر)", checks_due_between(since, yesterday), CHECK_COLUMNS, today)
+    with col2:
+        st.subheader("👥 طلبکاران/بدهکاران")
+        _due_section(f"سررسید تا {days} روز آینده", debts_due_between(today, until), DEBT_COLUMNS, today)
+        _due_section(f"گذشته از سررسید ({overdue_days} روز اخیر)", debts_due_between(since, yesterday), DEBT_COLUMNS, today)
+
+
+def render(menu):
+    st.header("⏰ سررسیدها")
+    col1, col2 = st.columns(2)
+    with col1:
+        days = st.number_input("روزهای آینده", min_value=1, max_value=365, value=7)
+    with col2:
+        overdue_days = st.number_input("روزهای گذشته", min_value=1, max_value=3650, value=30)
+    due_widget(int(days), int(overdue_days))
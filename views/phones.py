@@ -0,0 +1,9 @@
+from lines_utils import phone_numbers_management
+
+
+# ---------------------
+# 📞 شماره‌های تلفن و شرکا
+# ---------------------
+def render(menu):
+    """صفحه مدیریت شماره‌های تلفن و شرکا"""
+    phone_numbers_management()
@@ -0,0 +1,41 @@
+import streamlit as st
+
+from engine import reconcile_balances, rebuild_balances, DRIFT_TOLERANCE
+from format_utils import format_currency_series
+
+
+# ---------------------
+# ⚖️ تطبیق موجودی‌ها
+# ---------------------
+def render(menu):
+    """صفحه مقایسه موجودی بانک‌ها با تاریخچه تراکنش‌ها و اصلاح مغایرت‌ها"""
+    st.header("⚖️ تطبیق موجودی‌ها با تراکنش‌ها")
+
+    df = reconcile_balances()
+    if df.empty:
+        st.info("هیچ بانکی وجود ندارد.")
+        return
+
+    drifted = df["Balance"].isna() | (df["Drift"].abs() > DRIFT_TOLERANCE)
+
+    display_df = df.copy()
+    for column in ["Balance", "Opening Balance", "Deposits", "Withdrawals", "Expected", "Drift"]:
+        display_df[column] = format_currency_series(display_df[column])
+    display_df.columns = ["موجودی ثبت‌شده", "موجودی اولیه", "واریزها", "برداشت‌ها", "تعداد تراکنش", "موجودی محاسبه‌شده", "مغایرت"]
+    display_df.index.name = "نام بانک"
+    display_df.insert(0, "وضعیت", ["⚠️" if d else "✅" for d in drifted])
+    st.dataframe(display_df, use_container_width=True)
+
+    if not drifted.any():
+        st.success("موجودی همه بانک‌ها با تراکنش‌ها مطابقت دارد.")
+        return
+
+    missing = df.index[df["Balance"].isna()].tolist()
+    if missing:
+        st.warning(f"تراکنش‌هایی برای بانک‌های ناموجود ثبت شده است: {', '.join(missing)}")
+
+    st.warning(f"{int((drifted & df['Balance'].notna()).sum())} بانک با تاریخچه تراکنش‌ها مغایرت دارد.")
+    if st.button("اصلاح موجودی‌ها بر اساس تراکنش‌ها", type="primary"):
+        count = rebuild_balances()
+        st.success(f"موجودی {count} بانک اصلاح شد.")
+        st.rerun()
@@ -0,0 +1,88 @@
+import streamlit as st
+
+from db_utils import load_transactions_between, load_transaction_months
+from engine import load_today_transactions, load_month_transactions, get_today_jalali_str, transaction_totals
+from format_utils import format_currency, format_currency_series
+
+
+# ---------------------
+# 📊 تراکنش های روزانه
+# ---------------------
+def daily_transactions():
+    """صفحه تراکنش‌های روز جاری"""
+    st.header("📅 تراکنش‌های روز جاری")
+
+    # فقط تراکنش‌های امروز از پایگاه داده خوانده می‌شوند
+    df_today = load_today_transactions()
+
+    if df_today.empty:
+        st.info("هیچ تراکنشی برای امروز ثبت نشده است.")
+    else:
+        # جمع‌ها از جدول جمع‌های روزانه خوانده می‌شوند
+        today = get_today_jalali_str()
+        total_income, total_expense = transaction_totals(today, today)
+
+        # فرمت مبلغ
+        df_today["Amount"] = format_currency_series(df_today["Amount"])
+
+        # تغییر نام ستون‌ها به فارسی برای نمایش بهتر
+        df_today.columns = ["نام بانک", "نوع تراکنش", "مبلغ", "تاریخ", "علت", "شخص", "رسید"]
+
+        st.dataframe(df_today, use_container_width=True)
+
+        st.markdown(f"💰 مجموع واریزها: **{format_currency(total_income)} ریال**")
+        st.markdown(f"💸 مجموع برداشت‌ها: **{format_currency(total_expense)} ریال**")
+
+
+# ---------------------
+# 📊 تراکنش‌های ماهانه و بازه تاریخ
+# ---------------------
+def monthly_transactions():
+    """صفحه تراکنش‌های یک ماه یا یک بازه تاریخ"""
+    st.header("🗓️ تراکنش‌های ماهانه")
+
+    period = st.radio("نمایش بر اساس", ["ماه", "بازه تاریخ"], horizontal=True)
+
+    if period == "ماه":
+        # فهرست ماه‌ها بدون خواندن تراکنش‌ها ساخته می‌شود
+        df_months = load_transaction_months()
+        if df_months.empty:
+            st.info("تراکنشی یافت نشد.")
+            st.stop()
+        month_counts = dict(zip(df_months["Month"], df_months["Count"]))
+        month = st.selectbox("ماه", list(month_counts), format_func=lambda m: f"{m} ({month_counts[m]} تراکنش)")
+        df_period = load_month_transactions(month)
+        start_date, end_date = f"{month}/01", f"{month}/31"
+    else:
+        today = get_today_jalali_str()
+        col1, col2 = st.columns(2)
+        with col1:
+            start_date = st.text_input("از تاریخ (YYYY/MM/DD)", value=today[:8] + "01")
+        with col2:
+            end_date = st.text_input("تا تاریخ (YYYY/MM/DD)", value=today)
+        start_date, end_date = start_date.strip(), end_date.strip()
+        df_period = load_transactions_between(start_date, end_date)
+
+    if df_period.empty:
+        st.info("تراکنشی یافت نشد.")
+    else:
+        total_income, total_expense = transaction_totals(start_date, end_date)
+
+        display_df = df_period.copy()
+        display_df["Amount"] = format_currency_series(display_df["Amount"])
+        display_df.columns = ["نام بانک", "نوع تراکنش", "مبلغ", "تاریخ", "علت", "شخص", "رسید"]
+
+        st.dataframe(display_df, hide_index=True, use_container_width=True)
+
+        st.markdown(f"""
+        - **جمع کل واریزها:** {format_currency(total_income)} ریال
+        - **جمع کل برداشت‌ها:** {format_currency(total_expense)} ریال
+        - **مانده:** {format_currency(total_income - total_expense)} ریال
+        """)
+
+
+def render(menu):
+    if menu == "تراکنش‌های روزانه":
+        daily_transactions()
+    else:
+        monthly_transactions()
@@ -0,0 +1,61 @@
+import streamlit as st
+
+from engine import load_balances, search_transactions
+from format_utils import format_currency, parse_currency, format_currency_series
+
+
+# ---------------------
+# 🔎 جستجوی تراکنش‌ها
+# ---------------------
+def search_page():
+    """صفحه جستجوی چندشرطی تراکنش‌ها"""
+    st.header("🔎 جستجوی تراکنش‌ها")
+
+    balances = load_balances()
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        bank_name = st.selectbox("بانک", ["همه"] + balances.bank_names())
+        transaction_type = st.selectbox("نوع تراکنش", ["همه", "واریز", "برداشت"])
+    with col2:
+        person = st.text_input("شخص (ابتدای نام)")
+        start_date = st.text_input("از تاریخ (YYYY/MM/DD)")
+        end_date = st.text_input("تا تاریخ (YYYY/MM/DD)")
+    with col3:
+        min_amount = st.text_input("حداقل مبلغ")
+        max_amount = st.text_input("حداکثر مبلغ")
+        limit = st.selectbox("حداکثر تعداد نتیجه", [100, 1000, 10000], index=1)
+
+    df = search_transactions(
+        bank_name=None if bank_name == "همه" else bank_name,
+        person=person,
+        transaction_type=None if transaction_type == "همه" else transaction_type,
+        start_date=start_date,
+        end_date=end_date,
+        min_amount=parse_currency(min_amount) if min_amount.strip() else None,
+        max_amount=parse_currency(max_amount) if max_amount.strip() else None,
+        limit=limit,
+    )
+
+    if df.empty:
+        st.info("تراکنشی با این شرایط یافت نشد.")
+        return
+
+    income = df.loc[df["Transaction Type"] == "واریز", "Amount"].sum()
+    expense = df.loc[df["Transaction Type"] == "برداشت", "Amount"].sum()
+
+    display_df = df.copy()
+    display_df["Amount"] = format_currency_series(display_df["Amount"])
+    display_df.columns = ["نام بانک", "نوع تراکنش", "مبلغ", "تاریخ", "علت", "شخص", "رسید"]
+    st.dataframe(display_df, hide_index=True, use_container_width=True)
+
+    if len(df) >= limit:
+        st.caption(f"فقط {limit} تراکنش جدیدتر نمایش داده شده است؛ شرایط را دقیق‌تر کنید.")
+    st.markdown(f"""
+    - **تعداد:** {len(df)}
+    - **جمع واریزها:** {format_currency(income)} ریال
+    - **جمع برداشت‌ها:** {format_currency(expense)} ریال
+    """)
+
+
+def render(menu):
+    search_page()
@@ -0,0 +1,39 @@
+import streamlit as st
+
+from search_utils import ensure_indexed, rebuild_index, search
+
+
+# ---------------------
+# 🔎 جستجوی متنی در همه بخش‌ها
+# ---------------------
+def text_search_page():
+    """صفحه جستجوی یک نام یا موضوع در تراکنش‌ها، چک‌ها، طلبکاران/بدهکاران و شماره‌ها"""
+    st.header("🔎 جستجو در همه بخش‌ها")
+
+    # داده‌هایی که پیش از اضافه شدن ایندکس ثبت شده‌اند یک بار ایندکس می‌شوند
+    ensure_indexed()
+
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        query = st.text_input("عبارت جستجو (نام، علت، توضیحات و ...)")
+    with col2:
+        limit = st.selectbox("حداکثر تعداد نتیجه", [50, 200, 1000], index=1)
+
+    if query.strip():
+        df = search(query, limit)
+        if df.empty:
+            st.info("نتیجه‌ای یافت نشد.")
+        else:
+            display_df = df[["Source", "Display"]].copy()
+            display_df.columns = ["بخش", "رکورد"]
+            st.dataframe(display_df, hide_index=True, use_container_width=True)
+            st.caption(f"{len(df)} نتیجه" + (" (فقط جدیدترین نتایج نمایش داده شده است)" if len(df) >= limit else ""))
+
+    # برای وقتی که فایل‌های اکسل بیرون از برنامه ویرایش شده‌اند
+    if st.button("بازسازی ایندکس جستجو"):
+        rebuild_index()
+        st.success("ایندکس جستجو بازسازی شد.")
+
+
+def render(menu):
+    text_search_page()
@@ -0,0 +1,227 @@
+from datetime import datetime
+
+import streamlit as st
+
+from db_utils import load_transactions, iter_transactions
+from engine import load_balances, add_transaction, delete_transactions, transaction_totals
+from date_utils import convert_to_jalali
+from format_utils import format_currency, parse_currency, format_currency_series
+from image_utils import save_image, thumbnail_series
+from export_utils import EXPORT_CHUNK_ROWS, export_widget
+
+# نام دایرکتوری‌ها
+receipts_dir = "receipts"
+
+
+# ---------------------
+# 💸 تراکنش جدید
+# ---------------------
+def new_transaction():
+    """صفحه ثبت تراکنش"""
+    balances = load_balances()
+    st.header("ثبت تراکنش")
+
+    if len(balances) == 0:
+        st.warning("هیچ بانکی وجود ندارد. ابتدا یک حساب ایجاد کنید.")
+    else:
+        col1, col2 = st.columns(2)
+        with col1:
+            selected_bank = st.selectbox("انتخاب بانک", balances.bank_names())
+            transaction_type = st.radio("نوع تراکنش", ["واریز", "برداشت"])
+            amount = st.text_input("مبلغ", value="0", key="amount_input")
+
+            if amount:
+                try:
+                    formatted_amount = format_currency(amount.replace(",", ""))
+                    st.caption(f"مبلغ به عدد: {formatted_amount}")
+                except:
+                    pass
+
+        with col2:
+            purpose = st.text_input("علت تراکنش")
+            person = st.text_input("شخص / شرکت")
+            date_choice = st.radio("تاریخ", ["تاریخ امروز", "ورود دستی"])
+
+            if date_choice == "ورود دستی":
+                date_input = st.text_input("تاریخ (YYYY/MM/DD)")
+                try:
+                    date = convert_to_jalali(date_input)
+                except:
+                    date = date_input
+            else:
+                today = datetime.today()
+                date = convert_to_jalali(today)
+                st.caption(f"تاریخ امروز: {date}")
+
+        receipt = st.file_uploader("آپلود تصویر رسید (اختیاری)", type=["jpg", "png", "jpeg"])
+
+        if st.button("ثبت تراکنش", type="primary"):
+            try:
+                transaction_amount = parse_currency(amount)
+                if transaction_amount <= 0:
+                    st.error("مبلغ باید بزرگتر از صفر باشد.")
+                    st.stop()
+
+
+                current_balance = balances.get_balance(selected_bank)
+
+                if transaction_type == "واریز":
+                    new_balance = current_balance + transaction_amount
+                else:
+                    new_balance = current_balance - transaction_amount
+                    if new_balance < 0:
+                        st.error("موجودی کافی نیست.")
+                        st.stop()
+
+                # ذخیره تصویر رسید
+                receipt_path = ""
+                if receipt is not None:
+                    receipt_path = save_image(receipt, receipts_dir)
+                    if receipt_path is None:
+                        st.stop()
+
+                # ثبت تراکنش جدید و به‌روزرسانی موجودی بانک
+                if add_transaction(balances, selected_bank, transaction_type, transaction_amount,
+                                   date, purpose, person, receipt_path) is None:
+                    st.error("موجودی کافی نیست.")
+                    st.stop()
+                new_balance = balances.get_balance(selected_bank)
+
+                st.success(f"""
+                تراکنش با موفقیت ثبت شد.
+                - موجودی قبلی: {format_currency(current_balance)} ریال
+                - موجودی جدید: {format_currency(new_balance)} ریال
+                """)
+            except ValueError as e:
+                st.error(f"خطا در ثبت تراکنش: {str(e)}")
+
+
+# ---------------------
+# 📊 نمایش تراکنش‌ها
+# ---------------------
+# منو ← (نوع تراکنش، نام فایل خروجی)
+LIST_TYPES = {
+    "نمایش تمام تراکنش‌ها": (None, "transactions"),
+    "تراکنش‌های واریزی": ("واریز", "deposits"),
+    "تراکنش‌های برداشتی": ("برداشت", "withdrawals"),
+}
+
+# ستون‌های فایل خروجی تراکنش‌ها
+TRANSACTION_EXPORT_COLUMNS = {
+    "Bank Name": "نام بانک", "Transaction Type": "نوع تراکنش", "Amount": "مبلغ", "Date": "تاریخ",
+    "Purpose": "علت", "Person": "شخص/شرکت", "Receipt": "رسید",
+}
+
+
+def export_transactions(menu):
+    """فرم خروجی تراکنش‌های یک منو؛ ردیف‌ها تکه‌تکه از پایگاه داده خوانده می‌شوند"""
+    transaction_type, name = LIST_TYPES[menu]
+    export_widget(
+        name, TRANSACTION_EXPORT_COLUMNS,
+        lambda start_date, end_date: iter_transactions(transaction_type, start_date, end_date, EXPORT_CHUNK_ROWS),
+        name
+    )
+
+
+def transactions_list(menu):
+    """صفحه نمایش تمام تراکنش‌ها یا فقط واریزی/برداشتی"""
+    df_transactions = load_transactions()
+    st.header(menu)
+
+    if not df_transactions.empty:
+        df = df_transactions
+
+        # جمع‌ها فقط از ستون‌های نوع تراکنش و مبلغ محاسبه می‌شوند
+        total_income, total_expense = transaction_totals()
+
+        # فیلتر بر اساس نوع تراکنش
+        if menu == "تراکنش‌های واریزی":
+            df = df[df["Transaction Type"] == "واریز"]
+            total = total_income
+        elif menu == "تراکنش‌های برداشتی":
+            df = df[df["Transaction Type"] == "برداشت"]
+            total = total_expense
+        else:
+            total = total_income - total_expense
+
+        if df.empty:
+            st.info("تراکنشی یافت نشد.")
+        else:
+            # تغییر نام ستون‌ها به فارسی
+            display_df = df.copy()
+            display_df.columns = ["نام بانک", "نوع تراکنش", "مبلغ", "تاریخ", "علت", "شخص/شرکت", "رسید"]
+
+            # فرمت کردن مبلغ
+            display_df["مبلغ"] = format_currency_series(display_df["مبلغ"])
+
+            # لینک به تصویر کوچک رسید به جای تصویر اصلی
+            display_df["رسید"] = thumbnail_series(display_df["رسید"])
+
+            # نمایش جدول
+            st.dataframe(
+                display_df,
+                column_config={
+                    "نام بانک": st.column_config.TextColumn(width="medium"),
+                    "نوع تراکنش": st.column_config.TextColumn(width="small"),
+                    "مبلغ": st.column_config.TextColumn("مبلغ (ریال)", width="medium"),
+                    "تاریخ": st.column_config.DateColumn("تاریخ", format="YYYY/MM/DD"),
+                    "علت": st.column_config.TextColumn(width="large"),
+                    "شخص/شرکت": st.column_config.TextColumn(width="medium"),
+                    "رسید": st.column_config.LinkColumn("رسید")
+                },
+                hide_index=True,
+                use_container_width=True
+            )
+
+            # نمایش جمع کل
+            if menu == "تراکنش‌های واریزی":
+                st.markdown(f"**جمع کل واریزها:** {format_currency(total)} ریال")
+            elif menu == "تراکنش‌های برداشتی":
+                st.markdown(f"**جمع کل برداشت‌ها:** {format_currency(total)} ریال")
+            else:
+                st.markdown(f"""
+                - **جمع کل واریزها:** {format_currency(total_income)} ریال
+                - **جمع کل برداشت‌ها:** {format_currency(total_expense)} ریال
+                - **مانده کل:** {format_currency(total)} ریال
+                """)
+
+            export_transactions(menu)
+    else:
+        st.info("تراکنشی یافت نشد.")
+
+
+# ---------------------
+# 🗑️ حذف تراکنش
+# ---------------------
+def delete_transactions_page():
+    """صفحه حذف گروهی تراکنش‌ها"""
+    balances = load_balances()
+    df_transactions = load_transactions()
+    st.header("🗑️ حذف تراکنش")
+
+    if df_transactions.empty:
+        st.warning("هیچ تراکنشی برای حذف وجود ندارد.")
+    else:
+        df_display = df_transactions.copy()
+        df_display["Amount"] = format_currency_series(df_display["Amount"])
+        df_display.columns = ["بانک", "نوع", "مبلغ", "تاریخ", "علت", "شخص", "رسید"]
+
+        selected_indexes = st.multiselect("تراکنش‌ها را برای حذف انتخاب کنید", df_display.index, format_func=lambda x: f"{df_display.loc[x, 'بانک']} - {df_display.loc[x, 'مبلغ']} - {df_display.loc[x, 'تاریخ']}")
+
+        if st.button("حذف تراکنش", type="primary", disabled=not selected_indexes):
+            balances_new, df_transactions_new = delete_transactions(balances, df_transactions, selected_indexes)
+
+            if balances_new is not None and df_transactions_new is not None:
+                df_transactions = df_transactions_new
+                st.success(f"{len(selected_indexes)} تراکنش با موفقیت حذف شد و موجودی بانک‌ها اصلاح گردید.")
+            else:
+                st.error("خطا در حذف تراکنش یا موجودی کافی برای اصلاح وجود ندارد.")
+
+
+def render(menu):
+    if menu == "تراکنش جدید":
+        new_transaction()
+    elif menu == "حذف تراکنش":
+        delete_transactions_page()
+    else:
+        transactions_list(menu)